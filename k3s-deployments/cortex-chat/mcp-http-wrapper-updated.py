@@ -3,26 +3,95 @@
 HTTP wrapper for MCP stdio servers with proper MCP JSON-RPC support
 Supports both MCP JSON-RPC format (POST /) and legacy endpoints
 """
+import collections
+import io
+import itertools
 import json
+import logging
 import subprocess
 import sys
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 import os
+import re
 import threading
 import queue
 import time
 
+try:
+    import orjson
+
+    json_dumps = orjson.dumps
+    json_loads = orjson.loads
+except ImportError:
+    def json_dumps(obj):
+        return json.dumps(obj).encode()
+
+    json_loads = json.loads
+
 MCP_COMMAND = os.getenv('MCP_COMMAND', 'python main.py')
 PORT = int(os.getenv('PORT', '3000'))
+CACHE_TTL = int(os.getenv('MCP_LIST_CACHE_TTL', '60'))
+WRITE_BATCH = 16
+FORWARD_STDERR = os.getenv('MCP_FORWARD_STDERR', 'true').lower() in ('1', 'true', 'yes')
+STDERR_RING_SIZE = 1000
+STDERR_TAIL = 20
+MAX_BODY = int(os.getenv('HTTP_MAX_BODY', str(4 * 1024 * 1024)))
+HTTP_SEM = threading.BoundedSemaphore(int(os.getenv('HTTP_MAX_INFLIGHT', '32')))
+
+logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO'), stream=sys.stderr, format='%(message)s')
+logger = logging.getLogger('mcp-wrapper')
+
+# Fixed frames and bodies, serialized once at import
+INITIALIZE_PARAMS = {
+    'protocolVersion': '2024-11-05',
+    'capabilities': {},
+    'clientInfo': {
+        'name': 'cortex-http-wrapper',
+        'version': '1.0.0'
+    }
+}
+INITIALIZED_FRAME = json_dumps({
+    'jsonrpc': '2.0',
+    'method': 'notifications/initialized'
+}) + b'\n'
+PARSE_ERROR_BODY = json_dumps({
+    'jsonrpc': '2.0',
+    'error': {
+        'code': -32700,
+        'message': 'Parse error: Invalid JSON'
+    }
+})
+INVALID_REQUEST_BODY = json_dumps({
+    'jsonrpc': '2.0',
+    'error': {
+        'code': -32600,
+        'message': 'Invalid Request: jsonrpc must be "2.0"'
+    }
+})
+BUSY_BODY = json_dumps({'error': 'Too many in-flight requests'})
+
+# Leading top-level "id" of an MCP response frame, as written by JSON-RPC servers
+RESPONSE_ID = re.compile(rb'^(\{\s*(?:"jsonrpc"\s*:\s*"2\.0"\s*,\s*)?"id"\s*:\s*)\d+')
+
+def with_request_id(raw, request_id):
+    """Return the raw response frame with its id replaced, or None if the id is not leading"""
+    new_id = json_dumps(request_id)
+    frame, count = RESPONSE_ID.subn(lambda m: m.group(1) + new_id, raw, count=1)
+    return frame if count else None
 
 class MCPStdioClient:
     """Manages communication with MCP stdio server"""
     def __init__(self):
         self.process = None
-        self.message_id = 1
+        self._id_gen = itertools.count(1)
         self.pending_requests = {}
         self.lock = threading.Lock()
         self.started = False
+        # Cleared by the reader thread when MCP stdout hits EOF, so /health needs no waitpid
+        self.alive = False
+        self._list_cache = {}
+        self._write_q = queue.SimpleQueue()
+        self.stderr_ring = collections.deque(maxlen=STDERR_RING_SIZE)
 
     def start(self):
         """Start the MCP stdio process"""
@@ -30,135 +99,179 @@ class MCPStdioClient:
             return
 
         cmd = MCP_COMMAND.split()
-        print(f'[MCP-STDIO] Starting: {" ".join(cmd)}', file=sys.stderr)
+        logger.info('[MCP-STDIO] Starting: %s', ' '.join(cmd))
 
         self.process = subprocess.Popen(
             cmd,
             stdin=subprocess.PIPE,
             stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            bufsize=1,
-            universal_newlines=True
+            stderr=subprocess.PIPE if FORWARD_STDERR else subprocess.DEVNULL,
+            bufsize=-1
         )
 
+        self.alive = True
+
         # Start reader thread
         self.reader_thread = threading.Thread(target=self._read_responses, daemon=True)
         self.reader_thread.start()
 
+        # Start stdin writer thread
+        self.writer_thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self.writer_thread.start()
+
         # Start error reader thread
-        self.error_thread = threading.Thread(target=self._read_errors, daemon=True)
-        self.error_thread.start()
+        if FORWARD_STDERR:
+            self.error_thread = threading.Thread(target=self._read_errors, daemon=True)
+            self.error_thread.start()
 
         self.started = True
-        print(f'[MCP-STDIO] Process started, PID: {self.process.pid}', file=sys.stderr)
+        logger.info('[MCP-STDIO] Process started, PID: %s', self.process.pid)
 
-        # Give it a moment to start
-        time.sleep(1)
-
-        # Initialize the MCP server
+        # No warm-up sleep: stdin is buffered by the pipe until the server reads
+        # it, and the initialize response itself gates readiness
         self._initialize()
 
     def _read_errors(self):
-        """Read stderr from MCP process"""
+        """Drain stderr from MCP process into a bounded ring buffer"""
         while True:
             try:
                 line = self.process.stderr.readline()
                 if not line:
                     break
-                print(f'[MCP-STDERR] {line.rstrip()}', file=sys.stderr)
+                line = line.rstrip().decode('utf-8', 'replace')
+                self.stderr_ring.append(line)
+                logger.debug('[MCP-STDERR] %s', line)
             except Exception as e:
-                print(f'[MCP-STDERR-ERROR] {e}', file=sys.stderr)
+                logger.error('[MCP-STDERR-ERROR] %s', e)
                 break
 
+    def _writer_loop(self):
+        """Write queued frames to MCP stdin, coalescing whatever is pending into one write"""
+        while True:
+            frames = [self._write_q.get()]
+            while len(frames) < WRITE_BATCH:
+                try:
+                    frames.append(self._write_q.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                self.process.stdin.write(b''.join(frames))
+                self.process.stdin.flush()
+            except Exception as e:
+                logger.error('[MCP-WRITER-ERROR] %s', e)
+                # Nothing drains the queue after this, so fail fast instead of timing out
+                self._fail_pending(f'MCP stdin write failed: {e}')
+                break
+
+    def _send_frame(self, frame):
+        """Queue one newline-terminated JSON-RPC frame for the writer thread"""
+        self._write_q.put(frame)
+
     def _read_responses(self):
         """Read responses from MCP server"""
-        buffer = ''
         while True:
             try:
-                char = self.process.stdout.read(1)
-                if not char:
+                # MCP stdio frames are newline-delimited JSON-RPC messages
+                line = self.process.stdout.readline()
+                if not line:
                     break
 
-                buffer += char
+                line = line.strip()
+                if not line:
+                    continue
+
+                try:
+                    response = json_loads(line)
+                    msg_id = response.get('id')
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug('[MCP-RESPONSE] id=%s, keys=%s', msg_id, list(response.keys()))
+
+                    slot = self._complete(msg_id) if msg_id else None
+                    if slot is not None:
+                        slot[1] = response
+                        slot[2] = line
+                        slot[0].set()
+                    elif response.get('method', '').endswith('/list_changed'):
+                        # e.g. notifications/tools/list_changed -> tools/list
+                        method = response['method'][len('notifications/'):-len('_changed')]
+                        self._list_cache.pop(method, None)
+                except json.JSONDecodeError as e:
+                    logger.info('[MCP-STDOUT] %s', line.decode('utf-8', 'replace'))
+            except Exception as e:
+                logger.error('[MCP-READER-ERROR] %s', e)
+                break
 
-                if char == '\n':
-                    line = buffer.strip()
-                    buffer = ''
+        self._fail_pending('MCP process exited')
 
-                    if not line:
-                        continue
+    def _fail_pending(self, message):
+        """Mark the MCP process dead and answer every pending request with an error"""
+        self.alive = False
+        with self.lock:
+            slots = list(self.pending_requests.items())
+            self.pending_requests.clear()
+        for msg_id, slot in slots:
+            slot[1] = {
+                'jsonrpc': '2.0',
+                'id': msg_id,
+                'error': {
+                    'code': -32603,
+                    'message': f'Internal error: {message}'
+                }
+            }
+            slot[0].set()
 
-                    try:
-                        response = json.loads(line)
-                        msg_id = response.get('id')
-                        print(f'[MCP-RESPONSE] id={msg_id}, keys={list(response.keys())}', file=sys.stderr)
+    def _register(self):
+        """Allocate a message ID and its pending slot: [event set by the reader thread, response, raw frame]"""
+        # next() on itertools.count is atomic under the GIL; the lock only guards the dict
+        msg_id = next(self._id_gen)
+        slot = [threading.Event(), None, None]
+        with self.lock:
+            self.pending_requests[msg_id] = slot
+        return msg_id, slot
 
-                        if msg_id and msg_id in self.pending_requests:
-                            self.pending_requests[msg_id].put(response)
-                    except json.JSONDecodeError as e:
-                        print(f'[MCP-STDOUT] {line}', file=sys.stderr)
-            except Exception as e:
-                print(f'[MCP-READER-ERROR] {e}', file=sys.stderr)
-                break
+    def _complete(self, msg_id):
+        """Remove and return the pending slot for msg_id (None if already gone)"""
+        with self.lock:
+            return self.pending_requests.pop(msg_id, None)
 
     def _initialize(self):
         """Initialize the MCP server"""
-        with self.lock:
-            msg_id = self.message_id
-            self.message_id += 1
-
-        response_queue = queue.Queue()
-        self.pending_requests[msg_id] = response_queue
+        msg_id, slot = self._register()
 
         request = {
             'jsonrpc': '2.0',
             'id': msg_id,
             'method': 'initialize',
-            'params': {
-                'protocolVersion': '2024-11-05',
-                'capabilities': {},
-                'clientInfo': {
-                    'name': 'cortex-http-wrapper',
-                    'version': '1.0.0'
-                }
-            }
+            'params': INITIALIZE_PARAMS
         }
 
         try:
-            request_json = json.dumps(request)
-            print(f'[MCP-INIT] Sending initialize request', file=sys.stderr)
-            self.process.stdin.write(request_json + '\n')
-            self.process.stdin.flush()
+            logger.info('[MCP-INIT] Sending initialize request')
+            self._send_frame(json_dumps(request) + b'\n')
 
-            response = response_queue.get(timeout=10)
-            del self.pending_requests[msg_id]
+            if not slot[0].wait(timeout=10):
+                raise TimeoutError
+            response = slot[1]
 
             if 'error' in response:
-                print(f'[MCP-INIT-ERROR] {response["error"]}', file=sys.stderr)
+                logger.error('[MCP-INIT-ERROR] %s', response['error'])
                 return False
 
-            print(f'[MCP-INIT] Initialized successfully', file=sys.stderr)
+            logger.info('[MCP-INIT] Initialized successfully')
 
             # Send initialized notification
-            notification = {
-                'jsonrpc': '2.0',
-                'method': 'notifications/initialized'
-            }
-            self.process.stdin.write(json.dumps(notification) + '\n')
-            self.process.stdin.flush()
+            self._send_frame(INITIALIZED_FRAME)
 
             return True
 
-        except queue.Empty:
-            if msg_id in self.pending_requests:
-                del self.pending_requests[msg_id]
-            print(f'[MCP-INIT-ERROR] Timeout during initialization', file=sys.stderr)
+        except TimeoutError:
+            self._complete(msg_id)
+            logger.error('[MCP-INIT-ERROR] Timeout during initialization')
             return False
         except Exception as e:
-            if msg_id in self.pending_requests:
-                del self.pending_requests[msg_id]
-            print(f'[MCP-INIT-ERROR] {str(e)}', file=sys.stderr)
+            self._complete(msg_id)
+            logger.error('[MCP-INIT-ERROR] %s', e)
             return False
 
     def send_mcp_request(self, method, params=None, use_request_id=True):
@@ -173,15 +286,32 @@ class MCPStdioClient:
         Returns:
             Full MCP JSON-RPC response dict
         """
-        msg_id = None
-        if use_request_id:
-            with self.lock:
-                msg_id = self.message_id
-                self.message_id += 1
+        try:
+            msg_id, slot = self.submit_request(method, params, use_request_id)
+        except Exception as e:
+            return {
+                'jsonrpc': '2.0',
+                'id': None,
+                'error': {
+                    'code': -32603,
+                    'message': f'Internal error: {str(e)}'
+                }
+            }
+
+        if not use_request_id:
+            # Notification - no response expected
+            return {'jsonrpc': '2.0', 'result': None}
+
+        return self.wait_response(msg_id, slot)
 
-        response_queue = queue.Queue() if msg_id else None
-        if msg_id:
-            self.pending_requests[msg_id] = response_queue
+    def submit_request(self, method, params=None, use_request_id=True):
+        """
+        Write a JSON-RPC request to the MCP server without waiting for the reply
+
+        Returns:
+            (msg_id, slot) to pass to wait_response; (None, None) for notifications
+        """
+        msg_id, slot = self._register() if use_request_id else (None, None)
 
         request = {
             'jsonrpc': '2.0',
@@ -195,24 +325,22 @@ class MCPStdioClient:
             request['params'] = params
 
         try:
-            request_json = json.dumps(request)
-            print(f'[MCP-REQUEST] {request_json}', file=sys.stderr)
-            self.process.stdin.write(request_json + '\n')
-            self.process.stdin.flush()
-
-            if not use_request_id:
-                # Notification - no response expected
-                return {'jsonrpc': '2.0', 'result': None}
-
-            # Wait for response
-            response = response_queue.get(timeout=60)
-            del self.pending_requests[msg_id]
-
-            return response
-
-        except queue.Empty:
-            if msg_id and msg_id in self.pending_requests:
-                del self.pending_requests[msg_id]
+            # Checked after registering: a writer or reader that dies later fails this slot
+            if not self.alive:
+                raise RuntimeError('MCP process is not running')
+            logger.info('[MCP-REQUEST] method=%s id=%s', method, msg_id)
+            self._send_frame(json_dumps(request) + b'\n')
+        except Exception:
+            if msg_id:
+                self._complete(msg_id)
+            raise
+
+        return msg_id, slot
+
+    def wait_response(self, msg_id, slot, timeout=60):
+        """Wait for the response to a submitted request, or return a timeout error"""
+        if not slot[0].wait(timeout=timeout):
+            self._complete(msg_id)
             return {
                 'jsonrpc': '2.0',
                 'id': msg_id,
@@ -221,21 +349,30 @@ class MCPStdioClient:
                     'message': 'Request timeout'
                 }
             }
-        except Exception as e:
-            if msg_id and msg_id in self.pending_requests:
-                del self.pending_requests[msg_id]
-            return {
-                'jsonrpc': '2.0',
-                'id': msg_id,
-                'error': {
-                    'code': -32603,
-                    'message': f'Internal error: {str(e)}'
-                }
-            }
+        return slot[1]
+
+    def cached_list(self, method, ttl=CACHE_TTL):
+        """
+        Send a listing request (tools/list, resources/list, prompts/list),
+        reusing the last successful response while it is younger than ttl
+
+        The returned dict is a copy without an 'id' so the caller can set its own.
+        """
+        cached = self._list_cache.get(method)
+        if cached and time.monotonic() - cached[0] < ttl:
+            response = cached[1]
+        else:
+            response = self.send_mcp_request(method)
+            if 'error' not in response:
+                self._list_cache[method] = (time.monotonic(), response)
+
+        response = dict(response)
+        response.pop('id', None)
+        return response
 
     def list_tools(self):
         """List available tools"""
-        response = self.send_mcp_request('tools/list')
+        response = self.cached_list('tools/list')
 
         if 'error' in response:
             return {'success': False, 'error': response['error']}
@@ -275,96 +412,205 @@ class MCPStdioClient:
 # Global MCP client
 mcp_client = MCPStdioClient()
 
+def _handle_tools_call(params):
+    tool_name = params.get('name')
+    arguments = params.get('arguments', {})
+
+    if not tool_name:
+        return {
+            'jsonrpc': '2.0',
+            'id': None,
+            'error': {
+                'code': -32602,
+                'message': 'Invalid params: name required'
+            }
+        }
+    return mcp_client.submit_request('tools/call', {
+        'name': tool_name,
+        'arguments': arguments
+    })
+
+# MCP method -> handler(params); a handler returns a response dict or the
+# (msg_id, slot) of a request submitted to the MCP server
+METHOD_DISPATCH = {
+    'tools/list': lambda params: mcp_client.cached_list('tools/list'),
+    'tools/call': _handle_tools_call,
+    'resources/list': lambda params: mcp_client.cached_list('resources/list'),
+    'resources/read': lambda params: mcp_client.submit_request('resources/read', params),
+    'prompts/list': lambda params: mcp_client.cached_list('prompts/list'),
+    'prompts/get': lambda params: mcp_client.submit_request('prompts/get', params),
+}
+
 class MCPHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 keeps client connections open across tool calls
+    protocol_version = 'HTTP/1.1'
+
+    def _send_json(self, status, body, close=False):
+        """
+        Send a JSON response as a single write of status line, headers and body;
+        close=True drops the connection (e.g. body left unread)
+        """
+        if close:
+            self.close_connection = True
+        self.log_request(status)
+
+        head = (
+            f'{self.protocol_version} {status} {self.responses[status][0]}\r\n'
+            f'Server: {self.version_string()}\r\n'
+            f'Date: {self.date_time_string()}\r\n'
+            'Content-Type: application/json\r\n'
+            f'Content-Length: {len(body)}\r\n'
+            f'Connection: {"close" if self.close_connection else "keep-alive"}\r\n'
+            '\r\n'
+        )
+        self.wfile.write(head.encode('latin-1') + body)
+
     def do_POST(self):
-        # Read request body
-        content_length = int(self.headers['Content-Length'])
-        body = self.rfile.read(content_length)
+        # Shed load instead of queueing unbounded work on the MCP subprocess
+        if not HTTP_SEM.acquire(timeout=0):
+            self._send_json(503, BUSY_BODY, close=True)
+            return
 
         try:
-            request_data = json.loads(body)
-        except json.JSONDecodeError as e:
-            self.send_response(400)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps({
+            self._handle_post()
+        finally:
+            HTTP_SEM.release()
+
+    def _read_body(self):
+        """Read the request body in chunks, or return None after sending 400/413"""
+        try:
+            content_length = int(self.headers.get('Content-Length', '0') or 0)
+        except ValueError:
+            self._send_json(400, json_dumps({'error': 'Invalid Content-Length'}), close=True)
+            return None
+
+        if content_length < 0 or content_length > MAX_BODY:
+            self._send_json(413, json_dumps({'error': f'Request body exceeds {MAX_BODY} bytes'}), close=True)
+            return None
+
+        body = io.BytesIO()
+        remaining = content_length
+        while remaining > 0:
+            chunk = self.rfile.read(min(remaining, 65536))
+            if not chunk:
+                break
+            body.write(chunk)
+            remaining -= len(chunk)
+        return body.getvalue()
+
+    def _start_rpc(self, request_data):
+        """
+        Route one JSON-RPC request
+
+        Returns a response dict when it can be answered immediately, or the
+        (msg_id, slot) of a request submitted to the MCP server.
+        """
+        if not isinstance(request_data, dict) or request_data.get('jsonrpc') != '2.0':
+            return {
+                'jsonrpc': '2.0',
+                'id': None,
+                'error': {
+                    'code': -32600,
+                    'message': 'Invalid Request: jsonrpc must be "2.0"'
+                }
+            }
+
+        method = request_data.get('method')
+        params = request_data.get('params', {})
+        request_id = request_data.get('id')
+
+        handler = METHOD_DISPATCH.get(method)
+        if handler is None:
+            return {
                 'jsonrpc': '2.0',
+                'id': request_id,
                 'error': {
-                    'code': -32700,
-                    'message': 'Parse error: Invalid JSON'
+                    'code': -32601,
+                    'message': f'Method not found: {method}'
                 }
-            }).encode())
+            }
+
+        try:
+            return handler(params)
+        except Exception as e:
+            return {
+                'jsonrpc': '2.0',
+                'id': request_id,
+                'error': {
+                    'code': -32603,
+                    'message': f'Internal error: {str(e)}'
+                }
+            }
+
+    def _finish_rpc(self, request_data, pending):
+        """
+        Wait for a routed request if needed and return the encoded response
+        carrying the caller's request ID rather than the internal stdio msg_id
+
+        Returns None for a notification (a valid request without an id), which
+        gets no response; it is still dispatched, but not waited on.
+        """
+        if isinstance(request_data, dict):
+            if 'id' not in request_data and request_data.get('jsonrpc') == '2.0':
+                return None
+            request_id = request_data.get('id')
+        else:
+            request_id = None
+
+        if isinstance(pending, dict):
+            response = pending
+        else:
+            response = mcp_client.wait_response(*pending)
+            # Proxy the MCP server's frame as-is instead of re-encoding the parsed dict
+            raw = pending[1][2]
+            if raw is not None:
+                frame = with_request_id(raw, request_id)
+                if frame is not None:
+                    return frame
+
+        response['id'] = request_id
+        return json_dumps(response)
+
+    def _handle_post(self):
+        body = self._read_body()
+        if body is None:
+            return
+
+        try:
+            request_data = json_loads(body)
+        except json.JSONDecodeError as e:
+            self._send_json(400, PARSE_ERROR_BODY)
             return
 
         # MCP JSON-RPC endpoint at root path
         if self.path == '/':
-            print(f'[HTTP] MCP JSON-RPC request: {request_data}', file=sys.stderr)
+            logger.debug('[HTTP] MCP JSON-RPC request: %s', request_data)
+
+            if isinstance(request_data, list):
+                # JSON-RPC batch: put every call on the stdio pipe before
+                # waiting on any, so the MCP server can work on them together
+                pending = [self._start_rpc(item) for item in request_data]
+                responses = [self._finish_rpc(item, p) for item, p in zip(request_data, pending)]
+                responses = [r for r in responses if r is not None]
+
+                if responses:
+                    self._send_json(200, b'[' + b','.join(responses) + b']')
+                else:
+                    # A batch of notifications gets no response body
+                    self._send_json(202, b'')
+                return
 
             # Validate JSON-RPC format
             if request_data.get('jsonrpc') != '2.0':
-                self.send_response(400)
-                self.send_header('Content-Type', 'application/json')
-                self.end_headers()
-                self.wfile.write(json.dumps({
-                    'jsonrpc': '2.0',
-                    'error': {
-                        'code': -32600,
-                        'message': 'Invalid Request: jsonrpc must be "2.0"'
-                    }
-                }).encode())
+                self._send_json(400, INVALID_REQUEST_BODY)
                 return
 
-            method = request_data.get('method')
-            params = request_data.get('params', {})
-            request_id = request_data.get('id')
-
-            # Route MCP methods
-            if method == 'tools/list':
-                response = mcp_client.send_mcp_request('tools/list')
-            elif method == 'tools/call':
-                tool_name = params.get('name')
-                arguments = params.get('arguments', {})
+            response = self._finish_rpc(request_data, self._start_rpc(request_data))
 
-                if not tool_name:
-                    response = {
-                        'jsonrpc': '2.0',
-                        'id': request_id,
-                        'error': {
-                            'code': -32602,
-                            'message': 'Invalid params: name required'
-                        }
-                    }
-                else:
-                    response = mcp_client.send_mcp_request('tools/call', {
-                        'name': tool_name,
-                        'arguments': arguments
-                    })
-            elif method == 'resources/list':
-                response = mcp_client.send_mcp_request('resources/list')
-            elif method == 'resources/read':
-                response = mcp_client.send_mcp_request('resources/read', params)
-            elif method == 'prompts/list':
-                response = mcp_client.send_mcp_request('prompts/list')
-            elif method == 'prompts/get':
-                response = mcp_client.send_mcp_request('prompts/get', params)
+            if response is None:
+                self._send_json(202, b'')
             else:
-                response = {
-                    'jsonrpc': '2.0',
-                    'id': request_id,
-                    'error': {
-                        'code': -32601,
-                        'message': f'Method not found: {method}'
-                    }
-                }
-
-            # Ensure response has the request ID
-            if request_id is not None and 'id' not in response:
-                response['id'] = request_id
-
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps(response).encode())
+                self._send_json(200, response)
 
         elif self.path == '/call-tool':
             # Legacy endpoint: Call specific MCP tool with arguments
@@ -373,46 +619,35 @@ class MCPHandler(BaseHTTPRequestHandler):
                 arguments = request_data.get('arguments', {})
 
                 if not tool_name:
-                    self.send_response(400)
-                    self.send_header('Content-Type', 'application/json')
-                    self.end_headers()
-                    self.wfile.write(json.dumps({'error': 'tool_name required'}).encode())
+                    self._send_json(400, json_dumps({'error': 'tool_name required'}))
                     return
 
-                print(f'[HTTP] Calling tool: {tool_name} with args: {arguments}', file=sys.stderr)
+                logger.debug('[HTTP] Calling tool: %s with args: %s', tool_name, arguments)
 
                 # Call the specified tool
                 result = mcp_client.call_tool(tool_name, arguments)
 
-                self.send_response(200)
-                self.send_header('Content-Type', 'application/json')
-                self.end_headers()
-                self.wfile.write(json.dumps(result).encode())
+                self._send_json(200, json_dumps(result))
 
             except Exception as e:
-                print(f'[HTTP-ERROR] {e}', file=sys.stderr)
-                self.send_response(500)
-                self.send_header('Content-Type', 'application/json')
-                self.end_headers()
-                self.wfile.write(json.dumps({'error': str(e)}).encode())
+                logger.error('[HTTP-ERROR] %s', e)
+                self._send_json(500, json_dumps({'error': str(e)}))
 
         elif self.path == '/query':
             # Legacy endpoint: Use first tool (for backward compat)
             try:
                 query = request_data.get('query', '')
-                print(f'[HTTP] Query: {query}', file=sys.stderr)
+                logger.debug('[HTTP] Query: %s', query)
 
                 # List tools first to find the right one
                 tools_result = mcp_client.list_tools()
                 if not tools_result.get('success'):
-                    self.send_response(500)
-                    self.send_header('Content-Type', 'application/json')
-                    self.end_headers()
-                    self.wfile.write(json.dumps({'error': 'Failed to list tools'}).encode())
+                    self._send_json(500, json_dumps({'error': 'Failed to list tools'}))
                     return
 
                 tools = tools_result.get('tools', [])
-                print(f'[HTTP] Available tools: {[t.get("name") for t in tools]}', file=sys.stderr)
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug('[HTTP] Available tools: %s', [t.get('name') for t in tools])
 
                 # Try to find the best tool for this query
                 tool_name = None
@@ -421,56 +656,37 @@ class MCPHandler(BaseHTTPRequestHandler):
                     tool_name = tools[0].get('name')
 
                 if not tool_name:
-                    self.send_response(500)
-                    self.send_header('Content-Type', 'application/json')
-                    self.end_headers()
-                    self.wfile.write(json.dumps({'error': 'No tools available'}).encode())
+                    self._send_json(500, json_dumps({'error': 'No tools available'}))
                     return
 
                 # Call the tool
                 result = mcp_client.call_tool(tool_name, {'query': query})
 
-                self.send_response(200)
-                self.send_header('Content-Type', 'application/json')
-                self.end_headers()
-                self.wfile.write(json.dumps(result).encode())
+                self._send_json(200, json_dumps(result))
 
             except Exception as e:
-                print(f'[HTTP-ERROR] {e}', file=sys.stderr)
-                self.send_response(500)
-                self.send_header('Content-Type', 'application/json')
-                self.end_headers()
-                self.wfile.write(json.dumps({'error': str(e)}).encode())
+                logger.error('[HTTP-ERROR] %s', e)
+                self._send_json(500, json_dumps({'error': str(e)}))
         else:
-            self.send_response(404)
-            self.end_headers()
+            self._send_json(404, b'')
 
     def do_GET(self):
         if self.path == '/health':
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps({
+            self._send_json(200, json_dumps({
                 'status': 'healthy',
-                'mcp_running': mcp_client.started and mcp_client.process and not mcp_client.process.poll()
-            }).encode())
+                'mcp_running': mcp_client.started and mcp_client.alive,
+                'mcp_stderr': list(mcp_client.stderr_ring)[-STDERR_TAIL:]
+            }))
         elif self.path == '/list-tools':
             # Legacy endpoint: List available MCP tools
             try:
                 result = mcp_client.list_tools()
-                self.send_response(200)
-                self.send_header('Content-Type', 'application/json')
-                self.end_headers()
-                self.wfile.write(json.dumps(result).encode())
+                self._send_json(200, json_dumps(result))
             except Exception as e:
-                print(f'[HTTP-ERROR] {e}', file=sys.stderr)
-                self.send_response(500)
-                self.send_header('Content-Type', 'application/json')
-                self.end_headers()
-                self.wfile.write(json.dumps({'error': str(e)}).encode())
+                logger.error('[HTTP-ERROR] %s', e)
+                self._send_json(500, json_dumps({'error': str(e)}))
         else:
-            self.send_response(404)
-            self.end_headers()
+            self._send_json(404, b'')
 
     def log_message(self, format, *args):
         sys.stdout.write(f"[HTTP] {format % args}\n")
@@ -488,6 +704,9 @@ if __name__ == '__main__':
 
     mcp_client.start()
 
-    server = HTTPServer(('0.0.0.0', PORT), MCPHandler)
+    # One thread per connection so a slow tool call does not block other
+    # clients; responses are matched to callers by msg_id in the reader thread
+    server = ThreadingHTTPServer(('0.0.0.0', PORT), MCPHandler)
+    server.daemon_threads = True
     print(f'[Wrapper] HTTP server ready')
     server.serve_forever()
@@ -11,15 +11,47 @@ Automatically assembles expert teams based on:
 """
 
 import asyncio
+import heapq
 import json
 import logging
 import os
-import time
-from datetime import datetime, timedelta
+from collections import OrderedDict, defaultdict
+from datetime import date, datetime, timedelta
 from typing import Dict, List, Optional, Set
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from enum import Enum
 
+try:
+    import numpy as np
+except ImportError:
+    # NumPy is optional; without it agents are scored one at a time in Python
+    np = None
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:
+    # Without SciPy, batches are assembled one incident at a time
+    linear_sum_assignment = None
+
+try:
+    import orjson
+
+    def json_dumps(obj, indent: bool = False) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+except ImportError:
+    def _json_default(obj):
+        if isinstance(obj, datetime):
+            return obj.isoformat()
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+    def json_dumps(obj, indent: bool = False) -> bytes:
+        return json.dumps(obj, indent=2 if indent else None, default=_json_default).encode()
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
@@ -42,7 +74,38 @@ class SwarmStatus(Enum):
     DISBANDED = "disbanded"
 
 
-@dataclass
+# Statuses counted as active in swarm metrics
+ACTIVE_SWARM_STATUSES = frozenset({SwarmStatus.FORMING, SwarmStatus.ACTIVE})
+
+
+# Score weights by severity: (skill, availability, expertise, resolution, response)
+SCORE_WEIGHTS = {
+    IncidentSeverity.CRITICAL: (0.25, 0.15, 0.25, 0.20, 0.15),
+    IncidentSeverity.HIGH: (0.30, 0.20, 0.20, 0.15, 0.15),
+}
+DEFAULT_SCORE_WEIGHTS = (0.35, 0.25, 0.15, 0.15, 0.10)
+
+_score_kernel = None
+if np is not None and njit is not None:
+    # fastmath without 'ninf'/'nnan' (the kernel writes -inf for ineligible agents) and without
+    # 'contract'/'reassoc', so scores round exactly like the NumPy and pure-Python paths
+    @njit(cache=True, parallel=True, fastmath={'nsz', 'arcp', 'afn'})
+    def _score_kernel(skill_matrix, req, required_len, avail, cur, mx, nonskill, w_s, w_a, out):
+        """Compiled per-agent scoring over the struct-of-arrays agent pool"""
+        n_skills = skill_matrix.shape[1]
+        for i in prange(skill_matrix.shape[0]):
+            if not avail[i] or cur[i] >= mx[i]:
+                out[i] = -np.inf
+                continue
+
+            matched = 0
+            for j in range(n_skills):
+                matched += skill_matrix[i, j] * req[j]
+
+            out[i] = matched / required_len * w_s + (1.0 - cur[i] / mx[i]) * w_a + nonskill[i]
+
+
+@dataclass(slots=True)
 class Agent:
     id: str
     name: str
@@ -53,9 +116,10 @@ class Agent:
     expertise_score: float
     response_time_avg: float  # seconds
     resolution_rate: float  # 0.0-1.0
+    skill_mask: int = field(default=0, init=False, repr=False, compare=False)  # see _skill_bits
 
 
-@dataclass
+@dataclass(slots=True)
 class Incident:
     id: str
     title: str
@@ -70,7 +134,7 @@ class Incident:
     swarm_id: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Swarm:
     id: str
     incident_id: str
@@ -80,6 +144,10 @@ class Swarm:
     created_at: datetime
     updated_at: datetime
     metrics: Dict[str, any]
+    _agent_set: Set[str] = field(init=False, repr=False, compare=False)  # mirrors agents
+
+    def __post_init__(self):
+        self._agent_set = set(self.agents)
 
 
 class IncidentSwarmingCoordinator:
@@ -89,19 +157,63 @@ class IncidentSwarmingCoordinator:
         self.data_dir = data_dir
         self.agents: Dict[str, Agent] = {}
         self.incidents: Dict[str, Incident] = {}
-        self.swarms: Dict[str, Swarm] = {}
-        self.skill_index: Dict[str, Set[str]] = {}  # skill -> agent_ids
+        self.swarms: 'OrderedDict[str, Swarm]' = OrderedDict()
+        self._disbanded: 'OrderedDict[str, None]' = OrderedDict()  # eviction order for self.swarms
+        self.skill_index: Dict[str, Set[str]] = defaultdict(set)  # skill -> agent_ids
+        self._skill_bits: Dict[str, int] = {}  # skill -> bit in Agent.skill_mask
+
+        # Expertise, resolution and response terms of the score, per severity -> agent_id
+        self._nonskill_by_sev: Dict[IncidentSeverity, Dict[str, float]] = {}
+
+        # Agents with spare capacity, kept current as load changes
+        self._available: Set[str] = set()
+
+        self._swarm_seq = 0  # disambiguates swarm ids created in the same second
+
+        # Running aggregates behind get_swarm_metrics
+        self._total_swarms = 0
+        self._active_count = 0
+        self._active_swarm_agent_sum = 0
+        self._busy_count = 0
+        self._agent_load_sum = 0
+        self._available_count = 0
+        self._max_capacity_sum = 0
+
+        # Struct-of-arrays view of the agent pool for vectorized scoring (NumPy only)
+        self._agent_ids: List[str] = []
+        self._agent_pos: Dict[str, int] = {}  # agent_id -> row
+        self._skill_cols: Dict[str, int] = {}  # skill -> column of _skill_matrix
 
         # Configuration
         self.min_swarm_size = int(os.getenv('MIN_SWARM_SIZE', '2'))
         self.max_swarm_size = int(os.getenv('MAX_SWARM_SIZE', '5'))
         self.critical_response_time = int(os.getenv('CRITICAL_RESPONSE_TIME', '300'))  # 5 min
         self.high_response_time = int(os.getenv('HIGH_RESPONSE_TIME', '900'))  # 15 min
+        self.max_cached_swarms = int(os.getenv('MAX_CACHED_SWARMS', '1024'))
+        self._sla_map = {
+            IncidentSeverity.CRITICAL: self.critical_response_time,
+            IncidentSeverity.HIGH: self.high_response_time,
+            IncidentSeverity.MEDIUM: 3600,  # 1 hour
+            IncidentSeverity.LOW: 14400  # 4 hours
+        }
+        self.metrics_backup_days = int(os.getenv('METRICS_BACKUP_DAYS', '7'))
+
+        # Serializes agent load and swarm membership changes across concurrent callers
+        self._state_lock = asyncio.Lock()
+
+        # Disk writes are queued and flushed off the event loop by _persist_worker
+        self._persist_q: asyncio.Queue = asyncio.Queue()
+        self._persist_task: Optional[asyncio.Task] = None
+        self._metrics_file = f"{data_dir}/metrics/swarming-metrics.ndjson"
 
         os.makedirs(f"{data_dir}/swarms", exist_ok=True)
         os.makedirs(f"{data_dir}/incidents", exist_ok=True)
         os.makedirs(f"{data_dir}/metrics", exist_ok=True)
 
+        # Metrics are appended to one NDJSON file, held open and rotated daily
+        self._metrics_fp = open(self._metrics_file, 'ab')
+        self._metrics_day = date.fromtimestamp(os.path.getmtime(self._metrics_file))
+
         self._load_agents()
         self._build_skill_index()
         logger.info("Incident Swarming Coordinator initialized")
@@ -134,112 +246,316 @@ class IncidentSwarmingCoordinator:
     def _build_skill_index(self):
         """Build reverse index of skills to agents"""
         for agent_id, agent in self.agents.items():
+            agent.skill_mask = 0
             for skill in agent.skills:
-                if skill not in self.skill_index:
-                    self.skill_index[skill] = set()
                 self.skill_index[skill].add(agent_id)
+                bit = self._skill_bits.setdefault(skill, 1 << len(self._skill_bits))
+                agent.skill_mask |= bit
+
+            if self._has_capacity(agent):
+                self._available.add(agent_id)
+
+            self._available_count += agent.availability
+            self._busy_count += agent.current_incidents > 0
+            self._agent_load_sum += agent.current_incidents
+            self._max_capacity_sum += agent.max_concurrent
+
+        # Only the skill and availability terms depend on the incident or current load
+        for severity in IncidentSeverity:
+            _, _, w_e, w_r, w_rt = SCORE_WEIGHTS.get(severity, DEFAULT_SCORE_WEIGHTS)
+            self._nonskill_by_sev[severity] = {
+                agent_id: (agent.expertise_score * w_e +
+                           agent.resolution_rate * w_r +
+                           max(0, 1.0 - (agent.response_time_avg / 300)) * w_rt)
+                for agent_id, agent in self.agents.items()
+            }
+
+        if np is not None:
+            self._build_agent_arrays()
+            if _score_kernel is not None:
+                # Compile (or load from cache) now so the first swarm doesn't pay for it
+                self._score_all_agents([], IncidentSeverity.LOW)
+
+    def _build_agent_arrays(self):
+        """Build parallel per-agent arrays and an agent x skill matrix"""
+        agents = list(self.agents.values())
+        self._agent_ids = [a.id for a in agents]
+        self._agent_pos = {agent_id: i for i, agent_id in enumerate(self._agent_ids)}
+        self._skill_cols = {skill: i for i, skill in enumerate(self.skill_index)}
+
+        self._skill_matrix = np.zeros((len(agents), len(self._skill_cols)), dtype=np.int8)
+        for i, agent in enumerate(agents):
+            for skill in agent.skills:
+                self._skill_matrix[i, self._skill_cols[skill]] = 1
+
+        self._avail = np.array([a.availability for a in agents], dtype=bool)
+        self._cur = np.array([a.current_incidents for a in agents], dtype=np.int64)
+        self._max = np.array([a.max_concurrent for a in agents], dtype=np.int64)
+        self._nonskill_vec = {
+            severity: np.array([by_agent[agent_id] for agent_id in self._agent_ids], dtype=np.float64)
+            for severity, by_agent in self._nonskill_by_sev.items()
+        }
 
-    def _calculate_agent_score(self, agent: Agent, required_skills: List[str],
-                               severity: IncidentSeverity) -> float:
+    @staticmethod
+    def _has_capacity(agent: Agent) -> bool:
+        return agent.availability and agent.current_incidents < agent.max_concurrent
+
+    def _adjust_load(self, agent_id: str, delta: int):
+        """Change an agent's current incident count, keeping the score arrays and available set in sync"""
+        agent = self.agents[agent_id]
+        was_available = agent_id in self._available
+        old_load = agent.current_incidents
+        agent.current_incidents = max(0, old_load + delta)
+        self._agent_load_sum += agent.current_incidents - old_load
+        self._busy_count += (agent.current_incidents > 0) - (old_load > 0)
+        if np is not None:
+            self._cur[self._agent_pos[agent_id]] = agent.current_incidents
+
+        # Only agents crossing the capacity boundary change the set
+        if self._has_capacity(agent) != was_available:
+            if was_available:
+                self._available.discard(agent_id)
+            else:
+                self._available.add(agent_id)
+
+    def _inc_active(self, swarm: Swarm):
+        self._active_count += 1
+        self._active_swarm_agent_sum += len(swarm.agents)
+
+    def _dec_active(self, swarm: Swarm):
+        self._active_count -= 1
+        self._active_swarm_agent_sum -= len(swarm.agents)
+
+    def _skill_mask(self, skills: List[str]) -> int:
+        """Bitmask of the known skills in a list; unknown skills match no agent"""
+        mask = 0
+        for skill in skills:
+            mask |= self._skill_bits.get(skill, 0)
+        return mask
+
+    def _calculate_agent_score(self, agent: Agent, required_mask: int, required_len: int,
+                               nonskill: float, w_s: float, w_a: float) -> float:
         """Calculate agent suitability score for an incident"""
+        current, max_concurrent = agent.current_incidents, agent.max_concurrent
         if not agent.availability:
             return 0.0
 
-        if agent.current_incidents >= agent.max_concurrent:
+        if current >= max_concurrent:
             return 0.0
 
         # Skill match score
-        matched_skills = len(set(agent.skills) & set(required_skills))
-        skill_score = matched_skills / max(len(required_skills), 1)
+        matched_skills = (agent.skill_mask & required_mask).bit_count()
+        skill_score = matched_skills / required_len
 
         # Availability score (prefer agents with fewer current incidents)
-        availability_score = 1.0 - (agent.current_incidents / agent.max_concurrent)
-
-        # Expertise and performance scores
-        expertise_score = agent.expertise_score
-        resolution_score = agent.resolution_rate
-
-        # Response time score (lower is better)
-        response_score = max(0, 1.0 - (agent.response_time_avg / 300))
-
-        # Weight factors based on severity
+        availability_score = 1.0 - (current / max_concurrent)
+
+        # Expertise, resolution and response time are precomputed per severity
+        return skill_score * w_s + availability_score * w_a + nonskill
+
+    def _score_all_agents(self, required_skills: List[str], severity: IncidentSeverity,
+                          cur: Optional['np.ndarray'] = None) -> 'np.ndarray':
+        """Score every agent at once; unavailable or saturated agents get -inf
+
+        cur overrides the per-agent incident counts, for scoring against tentative loads.
+        """
+        if cur is None:
+            cur = self._cur
+        req = np.zeros(len(self._skill_cols), dtype=np.int8)
+        for skill in required_skills:
+            col = self._skill_cols.get(skill)
+            if col is not None:
+                req[col] = 1
+
+        w_s, w_a = SCORE_WEIGHTS.get(severity, DEFAULT_SCORE_WEIGHTS)[:2]
+        required_len = max(len(required_skills), 1)
+        nonskill = self._nonskill_vec[severity]
+
+        if _score_kernel is not None:
+            total = np.empty(len(self._agent_ids))
+            _score_kernel(self._skill_matrix, req, required_len, self._avail, cur, self._max,
+                          nonskill, w_s, w_a, total)
+            return total
+
+        skill_score = (self._skill_matrix @ req) / required_len
+        availability_score = 1.0 - cur / self._max
+        total = skill_score * w_s + availability_score * w_a + nonskill
+        total[~self._avail | (cur >= self._max)] = -np.inf
+        return total
+
+    @staticmethod
+    def _top_k(total: 'np.ndarray', rows: 'np.ndarray', k: int) -> 'np.ndarray':
+        """Rows with the k highest scores, best first"""
+        k = min(k, len(rows))
+        if k == 0:
+            return rows[:0]
+
+        # O(N) top-k partition, then order only the k winners
+        top = rows[np.argpartition(total[rows], -k)[-k:]]
+        return top[np.argsort(-total[top], kind='stable')]
+
+    def _select_agents_vectorized(self, incident: Incident, target_size: int) -> List[str]:
+        """Pick the top target_size agents by score using NumPy"""
+        total = self._score_all_agents(incident.required_skills, incident.severity)
+        eligible = total > 0
+        cols = [self._skill_cols[skill] for skill in incident.required_skills if skill in self._skill_cols]
+        matching = self._skill_matrix[:, cols].any(axis=1)
+
+        # Agents with at least one required skill come first (best first = lead)
+        top = self._top_k(total, np.flatnonzero(eligible & matching), target_size)
+        if len(top) < target_size:
+            rest = self._top_k(total, np.flatnonzero(eligible & ~matching), target_size - len(top))
+            top = np.concatenate((top, rest))
+        return [self._agent_ids[i] for i in top]
+
+    def _top_agents_scalar(self, agent_ids: Set[str], k: int, required_mask: int, required_len: int,
+                           nonskill: Dict[str, float], w_s: float, w_a: float) -> List[str]:
+        """Score the given agents one at a time and return the k best"""
+        agents = self.agents
+        calc = self._calculate_agent_score
+        agent_scores = []
+        append = agent_scores.append
+        for agent_id in agent_ids:
+            score = calc(agents[agent_id], required_mask, required_len, nonskill[agent_id], w_s, w_a)
+            if score > 0:
+                append((agent_id, score))
+
+        # Highest score first (O(N log k) rather than a full sort)
+        top = heapq.nlargest(k, agent_scores, key=lambda x: x[1])
+        return [agent_id for agent_id, _ in top]
+
+    def _select_agents_scalar(self, incident: Incident, target_size: int) -> List[str]:
+        """Pick the top target_size agents by score, one agent at a time"""
+        required_mask = self._skill_mask(incident.required_skills)
+        required_len = max(len(incident.required_skills), 1)
+        w_s, w_a = SCORE_WEIGHTS.get(incident.severity, DEFAULT_SCORE_WEIGHTS)[:2]
+        nonskill = self._nonskill_by_sev[incident.severity]
+
+        # Only score agents with spare capacity holding at least one required skill
+        matching = set().union(*(self.skill_index.get(skill, ()) for skill in incident.required_skills))
+        selected = self._top_agents_scalar(self._available & matching, target_size,
+                                           required_mask, required_len, nonskill, w_s, w_a)
+
+        if len(selected) < target_size:
+            # Not enough skill matches; top up from the rest of the available pool
+            selected += self._top_agents_scalar(self._available - matching, target_size - len(selected),
+                                                required_mask, required_len, nonskill, w_s, w_a)
+        return selected
+
+    def _select_agents(self, incident: Incident, target_size: int) -> List[str]:
+        if np is not None:
+            return self._select_agents_vectorized(incident, target_size)
+        return self._select_agents_scalar(incident, target_size)
+
+    def _select_agents_batch(self, incidents: List[Incident], target_sizes: List[int]) -> List[List[str]]:
+        """Fill every incident's team jointly, one seat per incident per round
+
+        Each round solves a linear assignment between the incidents still short of
+        their target size and the agent pool, so the best agents are spread across
+        the batch instead of going to whichever incident was seen first. Rounds are
+        scored against the loads left by earlier rounds, which keeps agents within
+        max_concurrent and off any team they already joined.
+        """
+        cur = self._cur.copy()
+        teams: List[List[int]] = [[] for _ in incidents]
+        rows = [i for i, size in enumerate(target_sizes) if size > 0]
+        while rows:
+            scores = np.empty((len(rows), len(self._agent_ids)))
+            for r, i in enumerate(rows):
+                scores[r] = self._score_all_agents(incidents[i].required_skills, incidents[i].severity, cur)
+                scores[r, teams[i]] = -np.inf
+
+            # Ineligible pairs get a prohibitive finite cost and are dropped afterwards
+            eligible = scores > 0
+            row_ind, col_ind = linear_sum_assignment(np.where(eligible, -scores, 1e9))
+            assigned = False
+            for r, c in zip(row_ind, col_ind):
+                if eligible[r, c]:
+                    teams[rows[r]].append(c)
+                    cur[c] += 1
+                    assigned = True
+            if not assigned:
+                break
+
+            # Incidents that lost every candidate this round stay in for the next one
+            rows = [i for r, i in enumerate(rows) if len(teams[i]) < target_sizes[i] and eligible[r].any()]
+
+        return [[self._agent_ids[c] for c in team] for team in teams]
+
+    def _target_size(self, severity: IncidentSeverity) -> int:
+        """Determine swarm size based on severity"""
         if severity == IncidentSeverity.CRITICAL:
-            weights = {
-                'skill': 0.25,
-                'availability': 0.15,
-                'expertise': 0.25,
-                'resolution': 0.20,
-                'response': 0.15
-            }
+            return self.max_swarm_size
         elif severity == IncidentSeverity.HIGH:
-            weights = {
-                'skill': 0.30,
-                'availability': 0.20,
-                'expertise': 0.20,
-                'resolution': 0.15,
-                'response': 0.15
-            }
-        else:
-            weights = {
-                'skill': 0.35,
-                'availability': 0.25,
-                'expertise': 0.15,
-                'resolution': 0.15,
-                'response': 0.10
-            }
+            return max(3, self.min_swarm_size)
+        return self.min_swarm_size
 
-        total_score = (
-            skill_score * weights['skill'] +
-            availability_score * weights['availability'] +
-            expertise_score * weights['expertise'] +
-            resolution_score * weights['resolution'] +
-            response_score * weights['response']
-        )
-
-        return total_score
-
-    def assemble_swarm(self, incident: Incident) -> Swarm:
+    async def assemble_swarm(self, incident: Incident) -> Swarm:
         """Assemble an optimal swarm team for an incident"""
         logger.info(f"Assembling swarm for incident {incident.id} ({incident.severity.name})")
-
-        # Determine swarm size based on severity
-        if incident.severity == IncidentSeverity.CRITICAL:
-            target_size = self.max_swarm_size
-        elif incident.severity == IncidentSeverity.HIGH:
-            target_size = max(3, self.min_swarm_size)
-        else:
-            target_size = self.min_swarm_size
-
-        # Score all agents
-        agent_scores = []
-        for agent_id, agent in self.agents.items():
-            score = self._calculate_agent_score(agent, incident.required_skills, incident.severity)
-            if score > 0:
-                agent_scores.append((agent_id, score))
-
-        # Sort by score descending
-        agent_scores.sort(key=lambda x: x[1], reverse=True)
-
-        # Select top agents
-        selected_agents = [agent_id for agent_id, _ in agent_scores[:target_size]]
-
-        if not selected_agents:
-            logger.error(f"No available agents for incident {incident.id}")
-            raise ValueError("No available agents for swarm")
-
+        target_size = self._target_size(incident.severity)
+
+        async with self._state_lock:
+            # Scoring is CPU-bound; run it in a worker thread so the event loop stays responsive
+            selected_agents = await asyncio.to_thread(self._select_agents, incident, target_size)
+
+            if not selected_agents:
+                logger.error(f"No available agents for incident {incident.id}")
+                raise ValueError("No available agents for swarm")
+
+            return self._create_swarm(incident, selected_agents, target_size)
+
+    async def assemble_swarms_batch(self, incidents: List[Incident]) -> List[Optional[Swarm]]:
+        """Assemble swarms for a batch of pending incidents with a joint assignment
+
+        Returns one entry per incident, None where no agents were available.
+        Falls back to assembling one incident at a time for single-incident
+        batches or when NumPy/SciPy are not installed.
+        """
+        if len(incidents) <= 1 or np is None or linear_sum_assignment is None:
+            swarms = []
+            for incident in incidents:
+                try:
+                    swarms.append(await self.assemble_swarm(incident))
+                except ValueError:
+                    swarms.append(None)
+            return swarms
+
+        logger.info(f"Assembling swarms for {len(incidents)} incidents")
+        target_sizes = [self._target_size(incident.severity) for incident in incidents]
+
+        async with self._state_lock:
+            teams = await asyncio.to_thread(self._select_agents_batch, incidents, target_sizes)
+
+            swarms = []
+            for incident, team, target_size in zip(incidents, teams, target_sizes):
+                if not team:
+                    logger.error(f"No available agents for incident {incident.id}")
+                    swarms.append(None)
+                    continue
+                swarms.append(self._create_swarm(incident, team, target_size))
+            return swarms
+
+    def _create_swarm(self, incident: Incident, selected_agents: List[str], target_size: int) -> Swarm:
+        """Create and register a swarm for selected agents; caller holds the state lock"""
         # First agent is the lead
         lead_agent = selected_agents[0]
 
-        # Create swarm
-        swarm_id = f"swarm-{incident.id}-{int(time.time())}"
+        # Create swarm; one clock read serves the id and both timestamps
+        now = datetime.now()
+        swarm_id = f"swarm-{incident.id}-{int(now.timestamp())}"
+        if swarm_id in self.swarms:
+            # Same incident reassembled within the same second
+            self._swarm_seq += 1
+            swarm_id = f"{swarm_id}-{self._swarm_seq}"
         swarm = Swarm(
             id=swarm_id,
             incident_id=incident.id,
             agents=selected_agents,
             lead_agent=lead_agent,
             status=SwarmStatus.FORMING,
-            created_at=datetime.now(),
-            updated_at=datetime.now(),
+            created_at=now,
+            updated_at=now,
             metrics={
                 'response_time_sla': self._get_response_sla(incident.severity),
                 'agents_requested': target_size,
@@ -250,7 +566,7 @@ class IncidentSwarmingCoordinator:
 
         # Update agent assignments
         for agent_id in selected_agents:
-            self.agents[agent_id].current_incidents += 1
+            self._adjust_load(agent_id, 1)
 
         # Update incident
         incident.swarm_id = swarm_id
@@ -258,91 +574,197 @@ class IncidentSwarmingCoordinator:
 
         # Store swarm
         self.swarms[swarm_id] = swarm
+        self._total_swarms += 1
+        self._inc_active(swarm)
         self._save_swarm(swarm)
+        self._evict_if_needed()
 
         logger.info(f"Swarm {swarm_id} assembled with {len(selected_agents)} agents, lead: {lead_agent}")
         return swarm
 
     def _get_response_sla(self, severity: IncidentSeverity) -> int:
         """Get response time SLA in seconds for severity"""
-        sla_map = {
-            IncidentSeverity.CRITICAL: self.critical_response_time,
-            IncidentSeverity.HIGH: self.high_response_time,
-            IncidentSeverity.MEDIUM: 3600,  # 1 hour
-            IncidentSeverity.LOW: 14400  # 4 hours
-        }
-        return sla_map.get(severity, 3600)
+        return self._sla_map.get(severity, 3600)
 
-    def update_swarm_status(self, swarm_id: str, status: SwarmStatus):
+    async def update_swarm_status(self, swarm_id: str, status: SwarmStatus):
         """Update swarm status"""
-        if swarm_id not in self.swarms:
-            logger.warning(f"Swarm {swarm_id} not found")
-            return
-
-        swarm = self.swarms[swarm_id]
-        old_status = swarm.status
-        swarm.status = status
-        swarm.updated_at = datetime.now()
-
-        if status == SwarmStatus.DISBANDED:
-            # Release agents
-            for agent_id in swarm.agents:
-                if agent_id in self.agents:
-                    self.agents[agent_id].current_incidents = max(0, self.agents[agent_id].current_incidents - 1)
-
-        self._save_swarm(swarm)
-        logger.info(f"Swarm {swarm_id} status: {old_status.value} -> {status.value}")
+        async with self._state_lock:
+            if swarm_id not in self.swarms:
+                logger.warning(f"Swarm {swarm_id} not found")
+                return
+
+            swarm = self.swarms[swarm_id]
+            old_status = swarm.status
+            swarm.status = status
+            swarm.updated_at = datetime.now()
+
+            was_active = old_status in ACTIVE_SWARM_STATUSES
+            if was_active != (status in ACTIVE_SWARM_STATUSES):
+                if was_active:
+                    self._dec_active(swarm)
+                else:
+                    self._inc_active(swarm)
+
+            if status == SwarmStatus.DISBANDED:
+                # Release agents
+                for agent_id in swarm.agents:
+                    if agent_id in self.agents:
+                        self._adjust_load(agent_id, -1)
+                self._disbanded[swarm_id] = None
+                self._disbanded.move_to_end(swarm_id)
+            elif old_status == SwarmStatus.DISBANDED:
+                self._disbanded.pop(swarm_id, None)
+
+            self._save_swarm(swarm)
+            self._evict_if_needed()
+            logger.info(f"Swarm {swarm_id} status: {old_status.value} -> {status.value}")
+
+    def _evict_if_needed(self):
+        """Drop the oldest disbanded swarms from memory once over max_cached_swarms
+
+        Disbanded swarms have released their agents and live on in their JSON
+        file; get_swarm() reloads them on demand. Swarms still holding agents
+        are never evicted.
+        """
+        while len(self.swarms) > self.max_cached_swarms and self._disbanded:
+            swarm_id, _ = self._disbanded.popitem(last=False)
+            self.swarms.pop(swarm_id, None)
+
+    def get_swarm(self, swarm_id: str) -> Optional[Swarm]:
+        """Look up a swarm, rehydrating evicted swarms from disk"""
+        swarm = self.swarms.get(swarm_id)
+        if swarm is not None:
+            return swarm
+
+        try:
+            with open(f"{self.data_dir}/swarms/{swarm_id}.json") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+
+        return Swarm(
+            id=data['id'],
+            incident_id=data['incident_id'],
+            agents=data['agents'],
+            lead_agent=data['lead_agent'],
+            status=SwarmStatus(data['status']),
+            created_at=datetime.fromisoformat(data['created_at']),
+            updated_at=datetime.fromisoformat(data['updated_at']),
+            metrics=data['metrics']
+        )
 
-    def add_agent_to_swarm(self, swarm_id: str, agent_id: str):
+    async def add_agent_to_swarm(self, swarm_id: str, agent_id: str):
         """Add an agent to an existing swarm (escalation)"""
-        if swarm_id not in self.swarms:
-            logger.warning(f"Swarm {swarm_id} not found")
-            return
-
-        if agent_id not in self.agents:
-            logger.warning(f"Agent {agent_id} not found")
-            return
-
-        swarm = self.swarms[swarm_id]
-        if agent_id in swarm.agents:
-            logger.info(f"Agent {agent_id} already in swarm {swarm_id}")
-            return
-
-        swarm.agents.append(agent_id)
-        swarm.updated_at = datetime.now()
-        self.agents[agent_id].current_incidents += 1
-
-        self._save_swarm(swarm)
-        logger.info(f"Added agent {agent_id} to swarm {swarm_id}")
+        async with self._state_lock:
+            if swarm_id not in self.swarms:
+                logger.warning(f"Swarm {swarm_id} not found")
+                return
+
+            if agent_id not in self.agents:
+                logger.warning(f"Agent {agent_id} not found")
+                return
+
+            swarm = self.swarms[swarm_id]
+            if agent_id in swarm._agent_set:
+                logger.info(f"Agent {agent_id} already in swarm {swarm_id}")
+                return
+
+            swarm._agent_set.add(agent_id)
+            swarm.agents.append(agent_id)
+            swarm.updated_at = datetime.now()
+            self._adjust_load(agent_id, 1)
+            if swarm.status in ACTIVE_SWARM_STATUSES:
+                self._active_swarm_agent_sum += 1
+
+            self._save_swarm(swarm)
+            logger.info(f"Added agent {agent_id} to swarm {swarm_id}")
 
     def _save_swarm(self, swarm: Swarm):
-        """Persist swarm data"""
-        swarm_file = f"{self.data_dir}/swarms/{swarm.id}.json"
+        """Queue swarm data for persistence"""
+        # Snapshot now; the swarm keeps changing while the write is pending
         swarm_data = {
             'id': swarm.id,
             'incident_id': swarm.incident_id,
-            'agents': swarm.agents,
+            'agents': list(swarm.agents),
             'lead_agent': swarm.lead_agent,
             'status': swarm.status.value,
-            'created_at': swarm.created_at.isoformat(),
-            'updated_at': swarm.updated_at.isoformat(),
-            'metrics': swarm.metrics
+            'created_at': swarm.created_at,
+            'updated_at': swarm.updated_at,
+            'metrics': dict(swarm.metrics)
         }
-        with open(swarm_file, 'w') as f:
-            json.dump(swarm_data, f, indent=2)
+        self._persist(('swarm', swarm.id, swarm_data))
 
-    def get_swarm_metrics(self) -> Dict:
-        """Get current swarming metrics"""
-        active_swarms = [s for s in self.swarms.values() if s.status in [SwarmStatus.FORMING, SwarmStatus.ACTIVE]]
+    def _persist(self, item: tuple):
+        """Hand a write to the background worker, or write inline when no event loop is running"""
+        if self._persist_task is None:
+            try:
+                self._persist_task = asyncio.get_running_loop().create_task(self._persist_worker())
+            except RuntimeError:
+                self._write_batch([item])
+                return
+        self._persist_q.put_nowait(item)
+
+    async def _persist_worker(self):
+        """Drain queued writes in batches and perform them in a worker thread"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._persist_q.get()]
+            while not self._persist_q.empty():
+                batch.append(self._persist_q.get_nowait())
 
+            try:
+                await loop.run_in_executor(None, self._write_batch, batch)
+            except Exception as e:
+                logger.error(f"Error persisting {len(batch)} queued writes: {e}", exc_info=True)
+            finally:
+                for _ in batch:
+                    self._persist_q.task_done()
+
+    def _write_batch(self, batch: List[tuple]):
+        """Write a batch of queued items; only the latest snapshot of each swarm is written"""
+        swarms = {}
+        metric_lines = []
+        for kind, key, data in batch:
+            if kind == 'swarm':
+                swarms[key] = data
+            else:
+                metric_lines.append(json_dumps(data) + b'\n')
+
+        for swarm_id, swarm_data in swarms.items():
+            with open(f"{self.data_dir}/swarms/{swarm_id}.json", 'wb') as f:
+                f.write(json_dumps(swarm_data, indent=True))
+
+        if metric_lines:
+            if date.today() != self._metrics_day:
+                self._rotate_metrics()
+            self._metrics_fp.writelines(metric_lines)
+            self._metrics_fp.flush()
+
+    def _rotate_metrics(self):
+        """Move the metrics file aside under its date and start a new one"""
+        self._metrics_fp.close()
+        os.replace(self._metrics_file, f"{self._metrics_file}.{self._metrics_day.isoformat()}")
+
+        expired = (date.today() - timedelta(days=self.metrics_backup_days)).isoformat()
+        prefix = os.path.basename(self._metrics_file) + '.'
+        metrics_dir = os.path.dirname(self._metrics_file)
+        for name in os.listdir(metrics_dir):
+            if name.startswith(prefix) and name[len(prefix):] < expired:
+                os.remove(os.path.join(metrics_dir, name))
+
+        self._metrics_fp = open(self._metrics_file, 'ab')
+        self._metrics_day = date.today()
+
+    def get_swarm_metrics(self) -> Dict:
+        """Get current swarming metrics from the running aggregates"""
         metrics = {
             'timestamp': datetime.now().isoformat(),
-            'total_swarms': len(self.swarms),
-            'active_swarms': len(active_swarms),
-            'available_agents': sum(1 for a in self.agents.values() if a.availability),
-            'busy_agents': sum(1 for a in self.agents.values() if a.current_incidents > 0),
-            'avg_swarm_size': sum(len(s.agents) for s in active_swarms) / max(len(active_swarms), 1),
-            'agent_utilization': sum(a.current_incidents for a in self.agents.values()) / sum(a.max_concurrent for a in self.agents.values())
+            'total_swarms': self._total_swarms,
+            'active_swarms': self._active_count,
+            'available_agents': self._available_count,
+            'busy_agents': self._busy_count,
+            'avg_swarm_size': self._active_swarm_agent_sum / max(self._active_count, 1),
+            'agent_utilization': self._agent_load_sum / self._max_capacity_sum
         }
 
         return metrics
@@ -357,9 +779,7 @@ class IncidentSwarmingCoordinator:
                 metrics = self.get_swarm_metrics()
 
                 # Save metrics
-                metrics_file = f"{self.data_dir}/metrics/swarming-metrics-{int(time.time())}.json"
-                with open(metrics_file, 'w') as f:
-                    json.dump(metrics, f, indent=2)
+                self._persist(('metrics', None, metrics))
 
                 logger.info(f"Active swarms: {metrics['active_swarms']}, "
                           f"Available agents: {metrics['available_agents']}, "
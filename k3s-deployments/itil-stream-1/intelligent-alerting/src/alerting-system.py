@@ -11,15 +11,60 @@ Smart alert routing and suppression:
 """
 
 import asyncio
+import functools
+import heapq
 import json
 import logging
 import os
+import re
+import sys
 import time
-from datetime import datetime, timedelta, time as dt_time
-from typing import Dict, List, Optional, Set
-from dataclasses import dataclass
+from collections import OrderedDict, deque
+from datetime import date, datetime, time as dt_time, timedelta
+from typing import Callable, Deque, Dict, List, Optional, Set, Tuple
+from dataclasses import dataclass, field
 from enum import Enum
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import uvloop
+except ImportError:
+    # uvloop is optional; the default asyncio loop is used without it
+    uvloop = None
+
+try:
+    import hyperscan
+except ImportError:
+    # Without Hyperscan, KEDB patterns are matched as one combined Python regex
+    hyperscan = None
+
+try:
+    from numba import njit
+except ImportError:
+    # Without Numba, duplicate candidates are compared one at a time with set intersection
+    njit = None
+
+
+def _json_default(obj):
+    # Also catches datetime subclasses, which orjson does not serialize natively
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+try:
+    import orjson
+
+    def json_dumps(obj) -> bytes:
+        return orjson.dumps(obj, default=_json_default)
+except ImportError:
+    def json_dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(',', ':'), default=_json_default).encode()
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
@@ -51,7 +96,50 @@ class EscalationLevel(Enum):
     L4 = 4  # Management
 
 
-@dataclass
+# Buckets with at least this many candidates are checked in one compiled call
+_BATCH_DEDUP_MIN = 16
+
+_any_similar = None
+if np is not None and njit is not None:
+    @njit(cache=True)
+    def _any_similar(query, hashes, offsets):
+        """Whether any candidate title is over 0.7 Jaccard-similar to the query title;
+        titles are sorted token hash arrays, candidates packed back to back in `hashes`"""
+        n_query = query.shape[0]
+        for c in range(offsets.shape[0] - 1):
+            i = 0
+            j = offsets[c]
+            end = offsets[c + 1]
+            intersection = 0
+            while i < n_query and j < end:
+                if query[i] == hashes[j]:
+                    intersection += 1
+                    i += 1
+                    j += 1
+                elif query[i] < hashes[j]:
+                    i += 1
+                else:
+                    j += 1
+
+            union = n_query + (end - offsets[c]) - intersection
+            if intersection / union > 0.7:
+                return True
+
+        return False
+
+# Weekday bits, indexed like datetime.weekday() (bit 0 = Monday)
+_DAY_BIT = {'mon': 1, 'tue': 2, 'wed': 4, 'thu': 8, 'fri': 16, 'sat': 32, 'sun': 64}
+
+# Business hours: Mon-Fri 9AM-5PM, as weekday bits and minutes since midnight
+BUSINESS_DAYS_MASK = 0b0011111
+BUSINESS_START_MINUTE = 9 * 60
+BUSINESS_END_MINUTE = 17 * 60
+
+# On-call team per severity, indexed by AlertSeverity.value
+_SEV_TO_TEAM = (None, 'sre', 'sre', 'sre', 'sre', 'sre')
+
+
+@dataclass(slots=True)
 class Alert:
     id: str
     title: str
@@ -64,9 +152,66 @@ class Alert:
     assigned_to: Optional[str]
     escalation_level: EscalationLevel
     metadata: Dict
+    title_tokens: frozenset = field(init=False, repr=False, compare=False)
+    epoch: float = field(init=False, repr=False, compare=False)  # timestamp as epoch seconds
+    token_hashes: Optional[object] = field(default=None, init=False, repr=False, compare=False)  # see _token_hashes
+
+    def __post_init__(self):
+        self.title_tokens = frozenset(self.title.lower().split())
+        self.epoch = self.timestamp.timestamp()
+
+
+def _compile_patterns(patterns: List[str]) -> Optional[Callable[[str], bool]]:
+    """Compile case-insensitive regexes into one matcher that reports whether any matches"""
+    valid = []
+    for pattern in patterns:
+        try:
+            re.compile(pattern)
+            valid.append(pattern)
+        except re.error as e:
+            logger.error(f"Skipping invalid KEDB pattern {pattern!r}: {e}")
+    if not valid:
+        return None
+
+    if hyperscan is not None:
+        try:
+            db = hyperscan.Database()
+            db.compile(expressions=[p.encode() for p in valid], ids=list(range(len(valid))),
+                       elements=len(valid),
+                       flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH] * len(valid))
+
+            def match(text: str) -> bool:
+                hits = []
+
+                def on_match(pattern_id, start, end, flags, context):
+                    hits.append(pattern_id)
+                    return True  # stop at the first match
+
+                try:
+                    db.scan(text.encode(), match_event_handler=on_match)
+                except hyperscan.error:
+                    # Some versions report a scan stopped by the handler as an error
+                    if not hits:
+                        raise
+                return bool(hits)
 
+            return match
+        except hyperscan.error as e:
+            logger.warning(f"Hyperscan could not compile KEDB patterns, using re: {e}")
 
-@dataclass
+    combined = re.compile('|'.join(f'(?:{p})' for p in valid), re.IGNORECASE)
+    return lambda text: combined.search(text) is not None
+
+
+def _token_hashes(alert: Alert):
+    """Sorted int64 hashes of the alert's title tokens, built on first use"""
+    hashes = alert.token_hashes
+    if hashes is None:
+        hashes = alert.token_hashes = np.array(sorted(hash(t) for t in alert.title_tokens), dtype=np.int64)
+    return hashes
+
+
+@dataclass(slots=True)
 class OnCallSchedule:
     team: str
     level: EscalationLevel
@@ -75,15 +220,89 @@ class OnCallSchedule:
     start_time: dt_time
     end_time: dt_time
     days: List[str]  # ['mon', 'tue', ...]
+    days_mask: int = field(init=False, repr=False, compare=False)  # see _DAY_BIT
+    start_minute: int = field(init=False, repr=False, compare=False)  # minutes since midnight
+    end_minute: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.days_mask = 0
+        for day in self.days:
+            self.days_mask |= _DAY_BIT[day]
+        self.start_minute = self.start_time.hour * 60 + self.start_time.minute
+        self.end_minute = self.end_time.hour * 60 + self.end_time.minute
 
 
-@dataclass
+@dataclass(slots=True)
 class EscalationPolicy:
     name: str
     severity_levels: List[AlertSeverity]
     escalation_chain: List[EscalationLevel]
     time_thresholds: Dict[int, int]  # level -> seconds
     business_hours_only: bool
+    thresholds_by_level: Tuple[Optional[int], ...] = field(init=False, repr=False, compare=False)  # indexed by level value
+    max_level: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.thresholds_by_level = tuple(self.time_thresholds.get(level)
+                                         for level in range(max(self.time_thresholds, default=0) + 1))
+        self.max_level = max(level.value for level in self.escalation_chain)
+
+
+class MetricWindow:
+    """Running totals over stored alerts whose timestamp is within the last `span` seconds"""
+
+    __slots__ = ('span', 'count', 'severity_sum', 'suppressed', 'escalated', '_members', '_heap')
+
+    def __init__(self, span: int):
+        self.span = span
+        self.count = 0
+        self.severity_sum = 0
+        self.suppressed = 0
+        self.escalated = 0
+        # alert id -> (epoch timestamp, severity value, status counted)
+        self._members: Dict[str, Tuple[float, int, AlertStatus]] = {}
+        # (epoch timestamp, alert id), oldest first, to expire members as time passes
+        self._heap: List[Tuple[float, str]] = []
+
+    def _apply(self, severity: int, status: AlertStatus, sign: int):
+        self.count += sign
+        self.severity_sum += sign * severity
+        if status == AlertStatus.SUPPRESSED:
+            self.suppressed += sign
+        elif status == AlertStatus.ESCALATED:
+            self.escalated += sign
+
+    def add(self, alert: Alert, ts: float, now: float):
+        """Count a newly stored alert, replacing any earlier alert with the same id"""
+        self.remove(alert.id)
+        if ts > now - self.span:
+            self._members[alert.id] = (ts, alert.severity.value, alert.status)
+            heapq.heappush(self._heap, (ts, alert.id))
+            self._apply(alert.severity.value, alert.status, 1)
+
+    def remove(self, alert_id: str):
+        member = self._members.pop(alert_id, None)
+        if member is not None:
+            self._apply(member[1], member[2], -1)
+
+    def set_status(self, alert_id: str, status: AlertStatus):
+        member = self._members.get(alert_id)
+        if member is not None and member[2] != status:
+            ts, severity, old_status = member
+            self._apply(severity, old_status, -1)
+            self._apply(severity, status, 1)
+            self._members[alert_id] = (ts, severity, status)
+
+    def expire(self, now: float):
+        """Drop members whose timestamp has left the window"""
+        cutoff = now - self.span
+        heap = self._heap
+        while heap and heap[0][0] <= cutoff:
+            ts, alert_id = heapq.heappop(heap)
+            member = self._members.get(alert_id)
+            # Skip entries left behind by an alert that was replaced
+            if member is not None and member[0] == ts:
+                self.remove(alert_id)
 
 
 class IntelligentAlertingSystem:
@@ -93,18 +312,54 @@ class IntelligentAlertingSystem:
         self.data_dir = data_dir
         self.alerts: Dict[str, Alert] = {}
         self.suppression_rules: List[Dict] = []
+        self._supp_rules: List[Tuple[str, int, Callable[[Alert, float], bool]]] = []
         self.on_call_schedules: List[OnCallSchedule] = []
         self.escalation_policies: Dict[str, EscalationPolicy] = {}
+        self._schedules_by_team: Dict[str, List[OnCallSchedule]] = {}
+        self._severity_to_policy: Dict[AlertSeverity, EscalationPolicy] = {}
 
         # Configuration
         self.alert_dedup_window = int(os.getenv('ALERT_DEDUP_WINDOW', '300'))  # 5 min
+        self.dedup_max_candidates = int(os.getenv('DEDUP_MAX_CANDIDATES', '1000'))
         self.max_alerts_per_hour = int(os.getenv('MAX_ALERTS_PER_HOUR', '50'))
         self.alert_fatigue_threshold = int(os.getenv('ALERT_FATIGUE_THRESHOLD', '20'))
+        self.resolved_retention = int(os.getenv('RESOLVED_ALERT_RETENTION', '86400'))  # 24 hours
+        self.metrics_backup_days = int(os.getenv('METRICS_BACKUP_DAYS', '7'))
+        # JSON list of regexes for known errors; alerts whose title or description match are suppressed
+        self.kedb_patterns_file = os.getenv('KEDB_PATTERNS_FILE', f"{data_dir}/kedb-patterns.json")
+        self._known_error_match: Optional[Callable[[str], bool]] = None
+        self._metrics_file = f"{data_dir}/metrics/alerting-metrics.ndjson"
 
         os.makedirs(f"{data_dir}/alerts", exist_ok=True)
         os.makedirs(f"{data_dir}/escalations", exist_ok=True)
         os.makedirs(f"{data_dir}/metrics", exist_ok=True)
 
+        # Metrics are appended to one NDJSON file, held open and rotated daily
+        self._metrics_fp = open(self._metrics_file, 'ab')
+        self._metrics_day = date.fromtimestamp(os.path.getmtime(self._metrics_file))
+
+        # Recent stored alerts per (source, severity) by id, oldest first, for duplicate checks
+        self._dedup_buckets: Dict[Tuple[str, AlertSeverity], OrderedDict[str, Alert]] = {}
+
+        # Timestamps of recent stored alerts per source by id, oldest first, for fatigue checks
+        self._by_source: Dict[str, OrderedDict[str, float]] = {}
+        self._fatigue_maxlen = max(self.max_alerts_per_hour * 2, self.alert_fatigue_threshold + 1)
+
+        # Resolved alerts in resolution order: (epoch seconds resolved, alert)
+        self._resolved_q: Deque[Tuple[float, Alert]] = deque()
+
+        # Pending escalation deadlines: (epoch seconds, alert_id, escalation level value, alert epoch)
+        self._escalation_heap: List[Tuple[float, str, int, float]] = []
+
+        # Rolling totals for get_metrics, updated as alerts are stored and change status
+        self._window_1h = MetricWindow(3600)
+        self._window_24h = MetricWindow(86400)
+
+        # Alert writes are queued and flushed off the event loop by _persist_worker
+        self._persist_q: asyncio.Queue = asyncio.Queue()
+        self._persist_task: Optional[asyncio.Task] = None
+        self._persist_loop: Optional[asyncio.AbstractEventLoop] = None
+
         self._load_on_call_schedules()
         self._load_escalation_policies()
         self._load_suppression_rules()
@@ -153,6 +408,10 @@ class IntelligentAlertingSystem:
             )
         ]
 
+        self._schedules_by_team = {}
+        for schedule in self.on_call_schedules:
+            self._schedules_by_team.setdefault(schedule.team, []).append(schedule)
+
     def _load_escalation_policies(self):
         """Load escalation policies"""
         self.escalation_policies = {
@@ -186,45 +445,71 @@ class IntelligentAlertingSystem:
             )
         }
 
+        # First policy listing a severity wins, as with the previous linear scan
+        self._severity_to_policy = {}
+        for policy in self.escalation_policies.values():
+            for severity in policy.severity_levels:
+                self._severity_to_policy.setdefault(severity, policy)
+
     def _load_suppression_rules(self):
         """Load alert suppression rules"""
+        self._load_known_error_patterns()
+
         self.suppression_rules = [
             {
                 'name': 'maintenance_window',
-                'condition': lambda alert: self._is_maintenance_window(alert),
+                'condition': lambda alert, now: self._is_maintenance_window(alert),
                 'severity': [AlertSeverity.LOW, AlertSeverity.MEDIUM]
             },
             {
                 'name': 'known_issue',
-                'condition': lambda alert: self._has_known_error(alert),
+                'condition': lambda alert, now: self._has_known_error(alert),
                 'severity': [AlertSeverity.LOW, AlertSeverity.MEDIUM, AlertSeverity.HIGH]
             },
             {
                 'name': 'alert_fatigue',
-                'condition': lambda alert: self._check_alert_fatigue(alert),
+                'condition': lambda alert, now: self._check_alert_fatigue(alert, now),
                 'severity': [AlertSeverity.LOW, AlertSeverity.MEDIUM]
             }
         ]
 
+        # Compiled form used by _should_suppress: (name, severity bitmask, predicate),
+        # cheapest predicates first; any matching rule suppresses, so order only
+        # affects cost
+        cost = {'known_issue': 0, 'maintenance_window': 1, 'alert_fatigue': 2}
+        self._supp_rules = [
+            (rule['name'],
+             sum(1 << severity.value for severity in set(rule['severity'])),
+             rule['condition'])
+            for rule in sorted(self.suppression_rules, key=lambda r: cost.get(r['name'], len(cost)))
+        ]
+
     def process_alert(self, alert: Alert) -> bool:
         """Process incoming alert through routing and suppression"""
         logger.info(f"Processing alert {alert.id} ({alert.severity.name})")
 
+        # Sources repeat across many alerts; share one string per source
+        alert.source = sys.intern(alert.source)
+
+        # One clock read for the whole pipeline, in epoch seconds
+        now = time.time()
+
         # Check for duplicate
-        if self._is_duplicate(alert):
+        if self._is_duplicate(alert, now):
             logger.info(f"Alert {alert.id} is duplicate, suppressing")
             alert.status = AlertStatus.SUPPRESSED
+            self._track_status(alert)
             return False
 
         # Apply suppression rules
-        if self._should_suppress(alert):
+        if self._should_suppress(alert, now):
             logger.info(f"Alert {alert.id} suppressed by rules")
             alert.status = AlertStatus.SUPPRESSED
             self._save_alert(alert)
             return False
 
         # Route alert
-        routed = self._route_alert(alert)
+        routed = self._route_alert(alert, now)
         if routed:
             alert.status = AlertStatus.ROUTED
             self._save_alert(alert)
@@ -234,47 +519,114 @@ class IntelligentAlertingSystem:
         logger.warning(f"Alert {alert.id} could not be routed")
         return False
 
-    def _is_duplicate(self, alert: Alert) -> bool:
+    def _is_duplicate(self, alert: Alert, now: Optional[float] = None) -> bool:
         """Check if alert is a duplicate"""
-        cutoff = datetime.now() - timedelta(seconds=self.alert_dedup_window)
+        if now is None:
+            now = time.time()
+
+        # Only alerts with the same source and severity can match
+        bucket = self._dedup_buckets.get((alert.source, alert.severity))
+        if not bucket:
+            return False
+
+        cutoff = now - self.alert_dedup_window
+        while bucket and next(iter(bucket.values())).epoch < cutoff:
+            bucket.popitem(last=False)
+
+        tokens = alert.title_tokens
+        if not tokens:
+            return False
+
+        # Jaccard similarity is at most min(|a|, |b|) / max(|a|, |b|), so titles
+        # whose word counts differ too much can't reach the threshold
+        n = len(tokens)
+        min_len = n * 7 // 10 + 1
+        max_len = (n * 10 - 1) // 7
+
+        if _any_similar is not None and len(bucket) >= _BATCH_DEDUP_MIN:
+            candidates = [_token_hashes(a) for a in bucket.values()
+                          if a.epoch >= cutoff and min_len <= len(a.title_tokens) <= max_len]
+            if not candidates:
+                return False
 
-        for existing_alert in self.alerts.values():
-            if existing_alert.timestamp < cutoff:
+            offsets = np.zeros(len(candidates) + 1, dtype=np.int64)
+            np.cumsum([len(c) for c in candidates], out=offsets[1:])
+            return bool(_any_similar(_token_hashes(alert), np.concatenate(candidates), offsets))
+
+        for existing_alert in bucket.values():
+            if existing_alert.epoch < cutoff:
+                continue
+
+            if not min_len <= len(existing_alert.title_tokens) <= max_len:
                 continue
 
-            # Same source, severity, and similar title
-            if (existing_alert.source == alert.source and
-                existing_alert.severity == alert.severity and
-                self._similar_titles(existing_alert.title, alert.title)):
+            if self._similar_titles(existing_alert.title_tokens, tokens):
                 return True
 
         return False
 
-    def _similar_titles(self, title1: str, title2: str) -> bool:
-        """Check if two titles are similar"""
+    def _index_alert(self, alert: Alert):
+        """Add a stored alert to the duplicate-check buckets"""
+        key = (alert.source, alert.severity)
+        bucket = self._dedup_buckets.get(key)
+        if bucket is None:
+            bucket = self._dedup_buckets[key] = OrderedDict()
+        bucket[alert.id] = alert
+        if len(bucket) > self.dedup_max_candidates:
+            bucket.popitem(last=False)
+
+        recent = self._by_source.get(alert.source)
+        if recent is None:
+            recent = self._by_source[alert.source] = OrderedDict()
+        recent[alert.id] = alert.epoch
+        if len(recent) > self._fatigue_maxlen:
+            recent.popitem(last=False)
+
+    def _unindex_alert(self, alert: Alert):
+        """Remove an alert that is no longer stored, e.g. replaced by a re-fire of its id"""
+        bucket = self._dedup_buckets.get((alert.source, alert.severity))
+        if bucket is not None and bucket.get(alert.id) is alert:
+            del bucket[alert.id]
+
+        recent = self._by_source.get(alert.source)
+        if recent is not None:
+            recent.pop(alert.id, None)
+
+    def _track_alert(self, alert: Alert, now: float):
+        """Count a stored alert in the metric windows"""
+        self._window_1h.add(alert, alert.epoch, now)
+        self._window_24h.add(alert, alert.epoch, now)
+
+    def _track_status(self, alert: Alert):
+        """Refresh a stored alert's status in the metric windows"""
+        if self.alerts.get(alert.id) is alert:
+            self._window_1h.set_status(alert.id, alert.status)
+            self._window_24h.set_status(alert.id, alert.status)
+
+    def _similar_titles(self, words1: frozenset, words2: frozenset) -> bool:
+        """Check if two titles, given as lowercased word sets, are similar"""
         # Simple similarity check - can be enhanced with fuzzy matching
-        words1 = set(title1.lower().split())
-        words2 = set(title2.lower().split())
-
         if not words1 or not words2:
             return False
 
-        intersection = words1 & words2
-        union = words1 | words2
-
-        similarity = len(intersection) / len(union)
+        intersection = len(words1 & words2)
+        similarity = intersection / (len(words1) + len(words2) - intersection)
         return similarity > 0.7
 
-    def _should_suppress(self, alert: Alert) -> bool:
+    def _should_suppress(self, alert: Alert, now: Optional[float] = None) -> bool:
         """Check if alert should be suppressed"""
-        for rule in self.suppression_rules:
-            if alert.severity in rule['severity']:
+        if now is None:
+            now = time.time()
+
+        severity_bit = 1 << alert.severity.value
+        for name, severity_mask, condition in self._supp_rules:
+            if severity_bit & severity_mask:
                 try:
-                    if rule['condition'](alert):
-                        logger.debug(f"Alert suppressed by rule: {rule['name']}")
+                    if condition(alert, now):
+                        logger.debug(f"Alert suppressed by rule: {name}")
                         return True
                 except Exception as e:
-                    logger.error(f"Error evaluating suppression rule {rule['name']}: {e}")
+                    logger.error(f"Error evaluating suppression rule {name}: {e}")
 
         return False
 
@@ -283,26 +635,54 @@ class IntelligentAlertingSystem:
         # Placeholder - check maintenance schedule
         return False
 
+    def _load_known_error_patterns(self):
+        """Compile KEDB patterns from the patterns file, if there is one"""
+        if not os.path.exists(self.kedb_patterns_file):
+            return
+
+        try:
+            with open(self.kedb_patterns_file) as f:
+                patterns = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error(f"Error loading KEDB patterns from {self.kedb_patterns_file}: {e}")
+            return
+
+        self._known_error_match = _compile_patterns([str(p) for p in patterns])
+        logger.info(f"Loaded {len(patterns)} KEDB patterns")
+
     def _has_known_error(self, alert: Alert) -> bool:
         """Check if alert matches a known error"""
-        # Placeholder - check KEDB
-        return False
+        if self._known_error_match is None:
+            return False
+        return self._known_error_match(f"{alert.title}\n{alert.description}")
 
-    def _check_alert_fatigue(self, alert: Alert) -> bool:
+    def _check_alert_fatigue(self, alert: Alert, now: Optional[float] = None) -> bool:
         """Check for alert fatigue conditions"""
-        # Count recent alerts from same source
-        cutoff = datetime.now() - timedelta(hours=1)
-        recent_alerts = [a for a in self.alerts.values()
-                        if a.source == alert.source and a.timestamp > cutoff]
+        if now is None:
+            now = time.time()
 
-        if len(recent_alerts) > self.alert_fatigue_threshold:
+        recent = self._by_source.get(alert.source)
+        if not recent:
+            return False
+
+        # Count recent alerts from same source, dropping expired ones from the head
+        cutoff = now - 3600
+        while recent and next(iter(recent.values())) <= cutoff:
+            recent.popitem(last=False)
+
+        # Timestamps may arrive out of order, so confirm the count when over the threshold
+        if (len(recent) > self.alert_fatigue_threshold and
+                sum(1 for ts in recent.values() if ts > cutoff) > self.alert_fatigue_threshold):
             logger.warning(f"Alert fatigue detected for source {alert.source}")
             return True
 
         return False
 
-    def _route_alert(self, alert: Alert) -> bool:
+    def _route_alert(self, alert: Alert, now: Optional[float] = None) -> bool:
         """Route alert to appropriate on-call person"""
+        if now is None:
+            now = time.time()
+
         # Get escalation policy
         policy = self._get_escalation_policy(alert.severity)
         if not policy:
@@ -310,12 +690,12 @@ class IntelligentAlertingSystem:
             return False
 
         # Check business hours restriction
-        if policy.business_hours_only and not self._is_business_hours():
+        if policy.business_hours_only and not self._is_business_hours(now):
             logger.info(f"Alert {alert.id} queued (outside business hours)")
             return False
 
         # Get on-call person for current time
-        on_call = self._get_on_call(alert.severity)
+        on_call = self._get_on_call(alert.severity, now)
         if not on_call:
             logger.error(f"No on-call person available for alert {alert.id}")
             return False
@@ -323,62 +703,58 @@ class IntelligentAlertingSystem:
         alert.assigned_to = on_call
         alert.escalation_level = EscalationLevel.L1
 
-        # Store alert
+        # Store alert, replacing an earlier alert with the same id
+        previous = self.alerts.get(alert.id)
+        if previous is not None:
+            self._unindex_alert(previous)
         self.alerts[alert.id] = alert
+        self._index_alert(alert)
+        self._track_alert(alert, now)
+        self._schedule_escalation(alert, policy)
 
         return True
 
     def _get_escalation_policy(self, severity: AlertSeverity) -> Optional[EscalationPolicy]:
         """Get escalation policy for severity"""
-        for policy in self.escalation_policies.values():
-            if severity in policy.severity_levels:
-                return policy
-        return None
+        return self._severity_to_policy.get(severity)
 
-    def _is_business_hours(self) -> bool:
+    def _is_business_hours(self, now: Optional[float] = None) -> bool:
         """Check if current time is business hours"""
-        now = datetime.now()
-        current_time = now.time()
-        current_day = now.strftime('%a').lower()
+        return self._business_hours_at(int(time.time() if now is None else now) // 60)
 
-        # Business hours: Mon-Fri 9AM-5PM
-        business_days = ['mon', 'tue', 'wed', 'thu', 'fri']
-        business_start = dt_time(9, 0)
-        business_end = dt_time(17, 0)
+    @functools.lru_cache(maxsize=4)
+    def _business_hours_at(self, minute: int) -> bool:
+        """Business-hours check for one minute since the epoch; cached, as the answer is fixed per minute"""
+        now = datetime.fromtimestamp(minute * 60)
+        current_minute = now.hour * 60 + now.minute
 
-        return (current_day in business_days and
-                business_start <= current_time <= business_end)
+        return bool((1 << now.weekday()) & BUSINESS_DAYS_MASK and
+                    BUSINESS_START_MINUTE <= current_minute <= BUSINESS_END_MINUTE)
 
-    def _get_on_call(self, severity: AlertSeverity) -> Optional[str]:
+    def _get_on_call(self, severity: AlertSeverity, now: Optional[float] = None) -> Optional[str]:
         """Get current on-call person"""
-        now = datetime.now()
-        current_time = now.time()
-        current_day = now.strftime('%a').lower()
-
-        # Map severity to team
-        team_map = {
-            AlertSeverity.CRITICAL: 'sre',
-            AlertSeverity.HIGH: 'sre',
-            AlertSeverity.MEDIUM: 'sre',
-            AlertSeverity.LOW: 'sre',
-            AlertSeverity.INFO: 'sre'
-        }
+        return self._on_call_at(int(time.time() if now is None else now) // 60, severity)
 
-        team = team_map.get(severity, 'sre')
+    @functools.lru_cache(maxsize=32)
+    def _on_call_at(self, minute: int, severity: AlertSeverity) -> Optional[str]:
+        """On-call lookup for one minute since the epoch; cached, as the answer is fixed per minute"""
+        now = datetime.fromtimestamp(minute * 60)
+        current_minute = now.hour * 60 + now.minute
+        day_bit = 1 << now.weekday()
 
-        # Find matching schedule
-        for schedule in self.on_call_schedules:
-            if schedule.team != team:
-                continue
+        team = _SEV_TO_TEAM[severity.value]
 
-            if current_day not in schedule.days:
+        # Find matching schedule
+        for schedule in self._schedules_by_team.get(team, ()):
+            if not schedule.days_mask & day_bit:
                 continue
 
             # Check time range (handle overnight shifts)
-            if schedule.start_time < schedule.end_time:
-                in_range = schedule.start_time <= current_time <= schedule.end_time
+            start, end = schedule.start_minute, schedule.end_minute
+            if start < end:
+                in_range = start <= current_minute <= end
             else:
-                in_range = current_time >= schedule.start_time or current_time <= schedule.end_time
+                in_range = current_minute >= start or current_minute <= end
 
             if in_range:
                 return schedule.primary
@@ -396,7 +772,7 @@ class IntelligentAlertingSystem:
             return False
 
         current_level = alert.escalation_level.value
-        if current_level >= max(level.value for level in policy.escalation_chain):
+        if current_level >= policy.max_level:
             logger.warning(f"Alert {alert_id} already at max escalation level")
             return False
 
@@ -407,8 +783,9 @@ class IntelligentAlertingSystem:
 
         # Update assignment
         # In production, would look up on-call for escalation level
-        alert.assigned_to = f"escalation-l{next_level.value}"
+        alert.assigned_to = sys.intern(f"escalation-l{next_level.value}")
 
+        self._schedule_escalation(alert, policy)
         self._save_alert(alert)
         logger.info(f"Alert {alert_id} escalated to level {next_level.name}")
 
@@ -435,8 +812,10 @@ class IntelligentAlertingSystem:
         if not alert:
             return False
 
+        now = time.time()
         alert.status = AlertStatus.RESOLVED
-        alert.metadata['resolved_at'] = datetime.now().isoformat()
+        alert.metadata['resolved_at'] = datetime.fromtimestamp(now).isoformat()
+        self._resolved_q.append((now, alert))
 
         self._save_alert(alert)
         logger.info(f"Alert {alert_id} resolved")
@@ -444,45 +823,117 @@ class IntelligentAlertingSystem:
         return True
 
     def _save_alert(self, alert: Alert):
-        """Persist alert data"""
-        alert_file = f"{self.data_dir}/alerts/{alert.id}.json"
+        """Queue alert data for persistence"""
+        self._track_status(alert)
+
+        # Snapshot now; the alert keeps changing while the write is pending
         alert_data = {
             'id': alert.id,
             'title': alert.title,
             'description': alert.description,
             'severity': alert.severity.name,
             'source': alert.source,
-            'timestamp': alert.timestamp.isoformat(),
+            'timestamp': alert.timestamp,
             'status': alert.status.value,
             'correlation_id': alert.correlation_id,
             'assigned_to': alert.assigned_to,
             'escalation_level': alert.escalation_level.name,
-            'metadata': alert.metadata
+            'metadata': dict(alert.metadata)
         }
-        with open(alert_file, 'w') as f:
-            json.dump(alert_data, f, indent=2)
+        self._persist((alert.id, alert_data))
+
+    def _persist(self, item: Tuple[str, Dict]):
+        """Hand a write to the background worker; callable from any thread"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        if self._persist_task is None:
+            if loop is None:
+                # No event loop anywhere yet; write inline
+                self._write_batch([item])
+                return
+            self._persist_loop = loop
+            self._persist_task = loop.create_task(self._persist_worker())
+
+        if loop is self._persist_loop:
+            self._persist_q.put_nowait(item)
+            return
+
+        # Called from a thread other than the worker's; asyncio.Queue is not thread-safe
+        try:
+            self._persist_loop.call_soon_threadsafe(self._persist_q.put_nowait, item)
+        except RuntimeError:
+            # Worker's loop is closed
+            self._write_batch([item])
+
+    async def _persist_worker(self):
+        """Drain queued writes in batches and perform them in a worker thread"""
+        while True:
+            batch = [await self._persist_q.get()]
+            while not self._persist_q.empty():
+                batch.append(self._persist_q.get_nowait())
+
+            try:
+                await asyncio.to_thread(self._write_batch, batch)
+            except Exception as e:
+                logger.error(f"Error persisting {len(batch)} queued writes: {e}", exc_info=True)
+            finally:
+                for _ in batch:
+                    self._persist_q.task_done()
+
+    def _write_batch(self, batch: List[Tuple[str, Dict]]):
+        """Write a batch of queued alerts; only the latest snapshot of each alert is written"""
+        latest = dict(batch)
+        for alert_id, alert_data in latest.items():
+            with open(f"{self.data_dir}/alerts/{alert_id}.json", 'wb') as f:
+                f.write(json_dumps(alert_data))
+
+    def _write_metrics(self, metrics: Dict):
+        """Append one metrics snapshot to the NDJSON metrics file"""
+        if date.today() != self._metrics_day:
+            self._rotate_metrics()
+        self._metrics_fp.write(json_dumps(metrics) + b'\n')
+        self._metrics_fp.flush()
+
+    def _rotate_metrics(self):
+        """Move the metrics file aside under its date and start a new one"""
+        self._metrics_fp.close()
+        os.replace(self._metrics_file, f"{self._metrics_file}.{self._metrics_day.isoformat()}")
+
+        expired = (date.today() - timedelta(days=self.metrics_backup_days)).isoformat()
+        prefix = os.path.basename(self._metrics_file) + '.'
+        metrics_dir = os.path.dirname(self._metrics_file)
+        for name in os.listdir(metrics_dir):
+            if name.startswith(prefix) and name[len(prefix):] < expired:
+                os.remove(os.path.join(metrics_dir, name))
+
+        self._metrics_fp = open(self._metrics_file, 'ab')
+        self._metrics_day = date.today()
 
     def get_metrics(self) -> Dict:
         """Get alerting system metrics"""
-        cutoff_1h = datetime.now() - timedelta(hours=1)
-        cutoff_24h = datetime.now() - timedelta(hours=24)
-
-        recent_alerts_1h = [a for a in self.alerts.values() if a.timestamp > cutoff_1h]
-        recent_alerts_24h = [a for a in self.alerts.values() if a.timestamp > cutoff_24h]
+        now = time.time()
+        self._window_1h.expire(now)
+        self._window_24h.expire(now)
 
-        suppressed = [a for a in recent_alerts_24h if a.status == AlertStatus.SUPPRESSED]
-        escalated = [a for a in recent_alerts_24h if a.status == AlertStatus.ESCALATED]
+        alerts_1h = self._window_1h.count
+        alerts_24h = self._window_24h.count
+        suppressed = self._window_24h.suppressed
+        escalated = self._window_24h.escalated
+        severity_sum = self._window_24h.severity_sum
 
         metrics = {
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': datetime.fromtimestamp(now).isoformat(),
             'total_alerts': len(self.alerts),
-            'alerts_1h': len(recent_alerts_1h),
-            'alerts_24h': len(recent_alerts_24h),
-            'suppressed_24h': len(suppressed),
-            'suppression_rate': len(suppressed) / max(len(recent_alerts_24h), 1),
-            'escalated_24h': len(escalated),
-            'escalation_rate': len(escalated) / max(len(recent_alerts_24h), 1),
-            'avg_severity': sum(a.severity.value for a in recent_alerts_24h) / max(len(recent_alerts_24h), 1)
+            'alerts_1h': alerts_1h,
+            'alerts_24h': alerts_24h,
+            'suppressed_24h': suppressed,
+            'suppression_rate': suppressed / max(alerts_24h, 1),
+            'escalated_24h': escalated,
+            'escalation_rate': escalated / max(alerts_24h, 1),
+            'avg_severity': severity_sum / max(alerts_24h, 1)
         }
 
         return metrics
@@ -491,43 +942,91 @@ class IntelligentAlertingSystem:
         """Main alerting system loop"""
         logger.info("Starting Intelligent Alerting System")
 
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        tick = 0
         while True:
             try:
                 # Check for alerts needing escalation
                 self._check_escalations()
 
+                # Forget alerts resolved longer than the retention window
+                if tick % 10 == 0:
+                    self._prune_resolved()
+                tick += 1
+
                 # Get and save metrics
                 metrics = self.get_metrics()
-                metrics_file = f"{self.data_dir}/metrics/alerting-metrics-{int(time.time())}.json"
-                with open(metrics_file, 'w') as f:
-                    json.dump(metrics, f, indent=2)
+                await asyncio.to_thread(self._write_metrics, metrics)
 
                 logger.info(f"Alerts (1h): {metrics['alerts_1h']}, "
                           f"Suppression rate: {metrics['suppression_rate']:.2%}, "
                           f"Escalation rate: {metrics['escalation_rate']:.2%}")
 
-                await asyncio.sleep(60)
+                # Schedule from the previous tick rather than from now, so time spent
+                # in the loop body doesn't push every later tick back
+                next_tick += 60
+                delay = next_tick - loop.time()
+                if delay < 0:
+                    # More than a full tick behind; restart the schedule instead of catching up
+                    next_tick = loop.time()
+                    delay = 0
+                await asyncio.sleep(delay)
 
             except Exception as e:
                 logger.error(f"Error in alerting loop: {e}", exc_info=True)
                 await asyncio.sleep(10)
+                next_tick = loop.time()
+
+    def _prune_resolved(self):
+        """Drop resolved alerts from memory once their retention has passed"""
+        cutoff = time.time() - self.resolved_retention
+        pruned = 0
+        while self._resolved_q and self._resolved_q[0][0] < cutoff:
+            _, alert = self._resolved_q.popleft()
+
+            # Skip alerts reopened or replaced since they were resolved
+            if alert.status != AlertStatus.RESOLVED or self.alerts.get(alert.id) is not alert:
+                continue
+
+            del self.alerts[alert.id]
+            self._unindex_alert(alert)
+            self._window_1h.remove(alert.id)
+            self._window_24h.remove(alert.id)
+            pruned += 1
+
+        if pruned:
+            logger.info(f"Pruned {pruned} resolved alerts")
+
+    def _schedule_escalation(self, alert: Alert, policy: EscalationPolicy):
+        """Queue the deadline after which the alert escalates past its current level"""
+        level = alert.escalation_level.value
+        thresholds = policy.thresholds_by_level
+        threshold = thresholds[level] if level < len(thresholds) else None
+        if threshold:
+            deadline = alert.epoch + threshold
+            heapq.heappush(self._escalation_heap, (deadline, alert.id, level, alert.epoch))
 
     def _check_escalations(self):
         """Check for alerts that need escalation"""
-        for alert in self.alerts.values():
-            if alert.status not in [AlertStatus.ROUTED, AlertStatus.ESCALATED]:
+        # Take everything due first: escalating pushes the next level's deadline,
+        # which must wait for the next check even if it has already passed
+        now = time.time()
+        heap = self._escalation_heap
+        due = []
+        while heap and heap[0][0] < now:
+            due.append(heapq.heappop(heap))
+
+        for _, alert_id, level, epoch in due:
+            alert = self.alerts.get(alert_id)
+
+            # Entries for alerts that moved on or were replaced since they were queued are stale
+            if alert is None or alert.escalation_level.value != level or alert.epoch != epoch:
                 continue
-
-            policy = self._get_escalation_policy(alert.severity)
-            if not policy:
+            if alert.status not in [AlertStatus.ROUTED, AlertStatus.ESCALATED]:
                 continue
 
-            # Check if escalation threshold exceeded
-            time_since_routed = (datetime.now() - alert.timestamp).total_seconds()
-            threshold = policy.time_thresholds.get(alert.escalation_level.value)
-
-            if threshold and time_since_routed > threshold:
-                self.escalate_alert(alert.id)
+            self.escalate_alert(alert_id)
 
 
 async def main():
@@ -536,4 +1035,6 @@ async def main():
 
 
 if __name__ == "__main__":
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     asyncio.run(main())
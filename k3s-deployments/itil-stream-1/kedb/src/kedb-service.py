@@ -11,23 +11,106 @@ Maintains searchable database of known errors:
 """
 
 import asyncio
+import copy
 import json
 import logging
 import os
 import time
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from collections import OrderedDict, defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
 from dataclasses import dataclass, asdict
 import hashlib
 
+try:
+    import numpy as np
+except ImportError:
+    # NumPy is optional; without it candidates are scored one at a time in Python
+    np = None
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+try:
+    import orjson
+
+    def json_dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:
+    def json_dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(',', ':')).encode()
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger('kedb')
 
-
-@dataclass
+# Base resolution time in minutes per category; see _estimate_resolution_time
+_BASE_RESOLUTION_TIME = {
+    'kubernetes': 15,
+    'database': 30,
+    'performance': 45,
+    'security': 20,
+    'networking': 25
+}
+
+# Fields that get_solution derives its steps and time estimate from
+_SOLUTION_FIELDS = frozenset({'permanent_fix', 'workaround', 'category'})
+
+# Candidate count from which search() prunes by upper-bound score before scoring
+_PRUNE_MIN_CANDIDATES = 32
+
+_score_candidates = None
+if np is not None and njit is not None:
+    @njit(cache=True)
+    def _score_candidates(rows, cat_ids, q_cat, sym_ids, sym_len, q_sym, q_sym_len,
+                          comp_ids, comp_len, q_comp, q_comp_len,
+                          scores, cat_match, sym_overlap, comp_overlap):
+        """Category, symptom and component part of the similarity score for each candidate row.
+
+        Attribute values are integer ids, rows padded with -1. A query length of -1 means
+        the query has no such field; the query lengths count values with no id too.
+        """
+        for k in range(rows.shape[0]):
+            row = rows[k]
+            score = 0.0
+
+            # Category match
+            if q_cat >= 0 and cat_ids[row] == q_cat:
+                score += 0.3
+                cat_match[k] = 1
+
+            # Symptom overlap
+            if q_sym_len >= 0:
+                overlap = 0
+                for i in range(q_sym.shape[0]):
+                    for j in range(sym_len[row]):
+                        if sym_ids[row, j] == q_sym[i]:
+                            overlap += 1
+                            break
+                if overlap:
+                    score += overlap / max(q_sym_len, sym_len[row]) * 0.4
+                sym_overlap[k] = overlap
+
+            # Component overlap
+            if q_comp_len >= 0:
+                overlap = 0
+                for i in range(q_comp.shape[0]):
+                    for j in range(comp_len[row]):
+                        if comp_ids[row, j] == q_comp[i]:
+                            overlap += 1
+                            break
+                if overlap:
+                    score += overlap / max(q_comp_len, comp_len[row]) * 0.2
+                comp_overlap[k] = overlap
+
+            scores[k] = score
+
+
+@dataclass(slots=True)
 class KnownError:
     id: str
     title: str
@@ -47,7 +130,7 @@ class KnownError:
     tags: List[str]
 
 
-@dataclass
+@dataclass(slots=True)
 class Solution:
     id: str
     known_error_id: str
@@ -60,7 +143,7 @@ class Solution:
     updated_at: datetime
 
 
-@dataclass
+@dataclass(slots=True)
 class SearchResult:
     known_error: KnownError
     similarity_score: float
@@ -74,17 +157,69 @@ class KEDBService:
         self.data_dir = data_dir
         self.known_errors: Dict[str, KnownError] = {}
         self.solutions: Dict[str, Solution] = {}
-        self.error_index: Dict[str, Set] = {}  # Various indices for fast search
+        # Various indices for fast search: attribute value -> bitmap of error rows
+        self.error_index: Dict[str, Dict[str, int]] = {}
+        self._id_to_row: Dict[str, int] = {}
+        self._row_ids: List[str] = []
+
+        # Description words per row as bitsets over a shared word vocabulary
+        self._word_bits: Dict[str, int] = {}
+        self._desc_masks: List[int] = []
+
+        # Parsed solution steps and resolution estimate per row, for get_solution
+        self._solution_steps: List[Tuple[str, ...]] = []
+        self._solution_eta: List[int] = []
+
+        # Per-row usage, success rate and verified flag for get_metrics
+        if np is not None:
+            self._usage_count = np.zeros(64, dtype=np.int64)
+            self._success_rate = np.zeros(64, dtype=np.float64)
+            self._verified = np.zeros(64, dtype=np.bool_)
+
+        # Integer-encoded category/symptoms/components per row for _score_candidates
+        self._cat2id: Dict[str, int] = {}
+        self._sym2id: Dict[str, int] = {}
+        self._comp2id: Dict[str, int] = {}
+        if _score_candidates is not None:
+            self._cat_ids = np.full(64, -1, dtype=np.int32)
+            self._sym_ids = np.full((64, 4), -1, dtype=np.int32)
+            self._sym_len = np.zeros(64, dtype=np.int32)
+            self._comp_ids = np.full((64, 4), -1, dtype=np.int32)
+            self._comp_len = np.zeros(64, dtype=np.int32)
+
+        # Recent search results by canonical query, least recently used first;
+        # emptied whenever an add or update changes what a search can return
+        self._search_cache: "OrderedDict[tuple, List[SearchResult]]" = OrderedDict()
 
         # Configuration
         self.min_similarity_threshold = float(os.getenv('MIN_SIMILARITY', '0.6'))
         self.auto_suggest_threshold = float(os.getenv('AUTO_SUGGEST_THRESHOLD', '0.8'))
+        self.snapshot_interval = int(os.getenv('SNAPSHOT_INTERVAL', '3600'))  # 1 hour
+        self.usage_flush_interval = float(os.getenv('USAGE_FLUSH_INTERVAL', '5'))  # seconds
+        self.metrics_backup_days = int(os.getenv('METRICS_BACKUP_DAYS', '7'))
+        self.search_cache_size = int(os.getenv('SEARCH_CACHE_SIZE', '256'))
+
+        self._wal_file = f"{data_dir}/known_errors.wal"
+        self._snapshot_file = f"{data_dir}/known_errors/snapshot.json"
+        self._metrics_file = f"{data_dir}/metrics/kedb-metrics.ndjson"
 
         os.makedirs(f"{data_dir}/known_errors", exist_ok=True)
         os.makedirs(f"{data_dir}/solutions", exist_ok=True)
         os.makedirs(f"{data_dir}/search_index", exist_ok=True)
         os.makedirs(f"{data_dir}/metrics", exist_ok=True)
 
+        # Changes are appended to a log as compact JSON lines; _write_snapshot
+        # periodically writes the full state and empties the log
+        self._wal = open(self._wal_file, 'ab', buffering=1 << 16)
+
+        # Errors whose usage changed since the last flush; see _flush_usage
+        self._dirty: Set[str] = set()
+        self._flush_task: Optional[asyncio.Task] = None
+
+        # Metrics are appended to one NDJSON file, held open and rotated daily
+        self._metrics_fp = open(self._metrics_file, 'ab')
+        self._metrics_day = date.fromtimestamp(os.path.getmtime(self._metrics_file))
+
         self._load_known_errors()
         self._build_search_index()
 
@@ -192,41 +327,148 @@ class KEDBService:
     def _build_search_index(self):
         """Build search indices for fast lookup"""
         self.error_index = {
-            'category': {},
-            'symptoms': {},
-            'components': {},
-            'tags': {}
+            'category': defaultdict(int),
+            'symptoms': defaultdict(int),
+            'components': defaultdict(int),
+            'tags': defaultdict(int)
         }
 
+        # Each error gets a dense row; postings are int bitmaps with one bit per row
+        self._row_ids = list(self.known_errors)
+        self._id_to_row = {error_id: row for row, error_id in enumerate(self._row_ids)}
+        self._desc_masks = [0] * len(self._row_ids)
+        self._solution_steps = [()] * len(self._row_ids)
+        self._solution_eta = [0] * len(self._row_ids)
+
+        index_error = self._index_error
         for error in self.known_errors.values():
-            # Category index
-            if error.category not in self.error_index['category']:
-                self.error_index['category'][error.category] = set()
-            self.error_index['category'][error.category].add(error.id)
-
-            # Symptom index
-            for symptom in error.symptoms:
-                if symptom not in self.error_index['symptoms']:
-                    self.error_index['symptoms'][symptom] = set()
-                self.error_index['symptoms'][symptom].add(error.id)
-
-            # Component index
-            for component in error.affected_components:
-                if component not in self.error_index['components']:
-                    self.error_index['components'][component] = set()
-                self.error_index['components'][component].add(error.id)
-
-            # Tag index
-            for tag in error.tags:
-                if tag not in self.error_index['tags']:
-                    self.error_index['tags'][tag] = set()
-                self.error_index['tags'][tag].add(error.id)
+            index_error(error)
+
+    def _index_error(self, error: KnownError, description_changed: bool = True):
+        """Set the error's row bit in each posting it belongs to"""
+        row = self._id_to_row[error.id]
+        bit = 1 << row
+
+        # Category index
+        self.error_index['category'][error.category] |= bit
+
+        # Symptom index
+        symptom_index = self.error_index['symptoms']
+        for symptom in error.symptoms:
+            symptom_index[symptom] |= bit
+
+        # Component index
+        component_index = self.error_index['components']
+        for component in error.affected_components:
+            component_index[component] |= bit
+
+        # Tag index
+        tag_index = self.error_index['tags']
+        for tag in error.tags:
+            tag_index[tag] |= bit
+
+        # Description words; the row keeps its bitset until the description itself changes
+        if description_changed:
+            word_bits = self._word_bits
+            mask = 0
+            for word in frozenset(error.description.lower().split()):
+                mask |= 1 << word_bits.setdefault(word, len(word_bits))
+            self._desc_masks[row] = mask
+
+        self._store_stats(error)
+        self._store_solution(error)
+        self._encode_error(error)
+
+    def _store_solution(self, error: KnownError):
+        """Precompute what get_solution derives from the error's fix text and category"""
+        row = self._id_to_row[error.id]
+        self._solution_steps[row] = tuple(self._parse_solution_steps(error.permanent_fix or error.workaround))
+        self._solution_eta[row] = self._estimate_resolution_time(error)
+
+    def _store_stats(self, error: KnownError):
+        """Copy the error's usage figures into its metrics row"""
+        if np is None:
+            return
+
+        row = self._id_to_row[error.id]
+        if row >= len(self._usage_count):
+            size = (row + 1) * 2
+            self._usage_count = np.resize(self._usage_count, size)
+            self._success_rate = np.resize(self._success_rate, size)
+            self._verified = np.resize(self._verified, size)
+
+        self._usage_count[row] = error.usage_count
+        self._success_rate[row] = error.success_rate
+        self._verified[row] = error.verified
+
+    def _unindex_error(self, error: KnownError):
+        """Clear the error's row bit from each posting it belongs to, dropping emptied postings"""
+        clear = ~(1 << self._id_to_row[error.id])
+
+        for index, values in ((self.error_index['category'], (error.category,)),
+                              (self.error_index['symptoms'], error.symptoms),
+                              (self.error_index['components'], error.affected_components),
+                              (self.error_index['tags'], error.tags)):
+            for value in values:
+                if value in index:
+                    remaining = index[value] & clear
+                    if remaining:
+                        index[value] = remaining
+                    else:
+                        del index[value]
+
+    def _encode_error(self, error: KnownError):
+        """Store the error's category, symptoms and components as ids in its scoring row"""
+        if _score_candidates is None:
+            return
+
+        row = self._id_to_row[error.id]
+        symptoms = {self._sym2id.setdefault(s, len(self._sym2id)) for s in error.symptoms}
+        components = {self._comp2id.setdefault(c, len(self._comp2id)) for c in error.affected_components}
+
+        rows = len(self._cat_ids)
+        width = max(self._sym_ids.shape[1], self._comp_ids.shape[1], len(symptoms), len(components))
+        if row >= rows or width > self._sym_ids.shape[1] or width > self._comp_ids.shape[1]:
+            self._grow_rows(max(rows, (row + 1) * 2), width)
+
+        self._cat_ids[row] = self._cat2id.setdefault(error.category, len(self._cat2id))
+        self._sym_ids[row] = -1
+        self._sym_ids[row, :len(symptoms)] = sorted(symptoms)
+        self._sym_len[row] = len(symptoms)
+        self._comp_ids[row] = -1
+        self._comp_ids[row, :len(components)] = sorted(components)
+        self._comp_len[row] = len(components)
+
+    def _grow_rows(self, rows: int, width: int):
+        """Reallocate the scoring rows to at least `rows` rows of `width` values"""
+        def grow(old, shape, fill):
+            new = np.full(shape, fill, dtype=old.dtype)
+            new[tuple(slice(0, d) for d in old.shape)] = old
+            return new
+
+        self._cat_ids = grow(self._cat_ids, rows, -1)
+        self._sym_ids = grow(self._sym_ids, (rows, width), -1)
+        self._sym_len = grow(self._sym_len, rows, 0)
+        self._comp_ids = grow(self._comp_ids, (rows, width), -1)
+        self._comp_len = grow(self._comp_len, rows, 0)
 
     def add_known_error(self, error: KnownError) -> str:
         """Add new known error to database"""
+        previous = self.known_errors.get(error.id)
         self.known_errors[error.id] = error
         self._save_known_error(error)
-        self._build_search_index()  # Rebuild index
+        self._search_cache.clear()
+
+        # A replaced error keeps its row; only its postings change
+        if previous is not None:
+            self._unindex_error(previous)
+        else:
+            self._id_to_row[error.id] = len(self._row_ids)
+            self._row_ids.append(error.id)
+            self._desc_masks.append(0)
+            self._solution_steps.append(())
+            self._solution_eta.append(0)
+        self._index_error(error)
 
         logger.info(f"Added known error: {error.id} - {error.title}")
         return error.id
@@ -239,6 +481,11 @@ class KEDBService:
 
         error = self.known_errors[error_id]
 
+        # Postings follow these fields, so index changes need the old values
+        reindex = bool({'category', 'symptoms', 'affected_components', 'tags', 'description'} & updates.keys())
+        if reindex:
+            self._unindex_error(copy.copy(error))
+
         # Update fields
         for key, value in updates.items():
             if hasattr(error, key):
@@ -247,99 +494,277 @@ class KEDBService:
         error.updated_at = datetime.now()
         self._save_known_error(error)
 
+        if reindex:
+            self._search_cache.clear()
+            self._index_error(error, description_changed='description' in updates)
+        else:
+            if {'verified', 'usage_count', 'success_rate'} & updates.keys():
+                self._store_stats(error)
+            if _SOLUTION_FIELDS & updates.keys():
+                self._store_solution(error)
+
         logger.info(f"Updated known error: {error_id}")
         return True
 
     def search(self, query: Dict) -> List[SearchResult]:
         """Search for matching known errors"""
-        candidates = set()
+        # Query terms are built once for all candidates; None marks a field the query lacks
+        q_cat = query.get('category')
+        q_sym = frozenset(query['symptoms']) if 'symptoms' in query else None
+        q_comp = frozenset(query['components']) if 'components' in query else None
+
+        # Recurring queries are answered from the cache until the next add or update
+        key = (q_cat, q_sym, q_comp, query.get('description'), self.min_similarity_threshold)
+        cache = self._search_cache
+        results = cache.get(key)
+        if results is not None:
+            cache.move_to_end(key)
+            logger.info(f"Search returned {len(results)} results (cached)")
+            return list(results)
+
+        # Candidates are a bitmap of error rows
+        candidates = 0
 
         # Search by category
-        if 'category' in query and query['category'] in self.error_index['category']:
-            candidates.update(self.error_index['category'][query['category']])
+        if 'category' in query:
+            candidates = self.error_index['category'].get(query['category'], 0)
 
         # Search by symptoms
         if 'symptoms' in query:
-            symptom_matches = set()
+            symptom_index = self.error_index['symptoms']
+            symptom_matches = 0
             for symptom in query['symptoms']:
-                if symptom in self.error_index['symptoms']:
-                    symptom_matches.update(self.error_index['symptoms'][symptom])
+                symptom_matches |= symptom_index.get(symptom, 0)
             if symptom_matches:
                 candidates = candidates & symptom_matches if candidates else symptom_matches
 
         # Search by components
         if 'components' in query:
-            component_matches = set()
+            component_index = self.error_index['components']
+            component_matches = 0
             for component in query['components']:
-                if component in self.error_index['components']:
-                    component_matches.update(self.error_index['components'][component])
+                component_matches |= component_index.get(component, 0)
             if component_matches:
                 candidates = candidates & component_matches if candidates else component_matches
 
-        # Calculate similarity for candidates
+        q_text = self._query_text(query)
+
+        # Skip candidates that cannot reach the threshold, without scoring them one by one
+        if self.min_similarity_threshold > 0 and candidates.bit_count() >= _PRUNE_MIN_CANDIDATES:
+            candidates = self._prune_candidates(candidates, q_cat, q_sym, q_comp, q_text)
+
+        # Calculate similarity for candidates, in row order
+        rows = []
+        while candidates:
+            low_bit = candidates & -candidates
+            candidates ^= low_bit
+            rows.append(low_bit.bit_length() - 1)
+
+        if _score_candidates is not None and rows:
+            results = self._score_rows(rows, q_cat, q_sym, q_comp, q_text)
+        else:
+            results = []
+            known_errors, row_ids = self.known_errors, self._row_ids
+            calculate_similarity = self._calculate_similarity
+            threshold = self.min_similarity_threshold
+            for row in rows:
+                error = known_errors[row_ids[row]]
+                similarity, factors = calculate_similarity(error, q_cat, q_sym, q_comp, q_text)
+
+                if similarity >= threshold:
+                    results.append(SearchResult(
+                        known_error=error,
+                        similarity_score=similarity,
+                        matching_factors=factors
+                    ))
+
+        # Sort by similarity
+        results.sort(key=lambda r: r.similarity_score, reverse=True)
+
+        cache[key] = results
+        if len(cache) > self.search_cache_size:
+            cache.popitem(last=False)
+
+        logger.info(f"Search returned {len(results)} results")
+        return list(results)
+
+    def _prune_candidates(self, candidates: int, q_cat: Optional[str], q_sym: Optional[frozenset],
+                          q_comp: Optional[frozenset], q_text: Optional[Tuple[int, int]]) -> int:
+        """Candidates whose upper-bound score reaches min_similarity_threshold
+
+        A row in k of the query's m symptom postings scores at most k/m on symptoms, and
+        likewise for components; the description adds at most its full weight. Bounds are
+        summed in the same order as _calculate_similarity, so no row that could match is dropped.
+        """
+        threshold = self.min_similarity_threshold
+
+        category_levels = [(0, candidates)]
+        if q_cat is not None:
+            category_levels.append((1, candidates & self.error_index['category'].get(q_cat, 0)))
+        symptom_levels = self._overlap_levels(candidates, self.error_index['symptoms'], q_sym)
+        component_levels = self._overlap_levels(candidates, self.error_index['components'], q_comp)
+
+        keep = 0
+        for category_match, category_rows in category_levels:
+            for k, symptom_rows in enumerate(symptom_levels):
+                rows = category_rows & symptom_rows
+                if not rows:
+                    break
+                # Higher component levels hold fewer rows, so the first level that reaches the threshold suffices
+                for j, component_rows in enumerate(component_levels):
+                    bound = 0.0
+                    if category_match:
+                        bound += 0.3
+                    if k:
+                        bound += k / len(q_sym) * 0.4
+                    if j:
+                        bound += j / len(q_comp) * 0.2
+                    if q_text is not None:
+                        bound += 0.1
+                    if bound >= threshold:
+                        keep |= rows & component_rows
+                        break
+
+        return keep
+
+    @staticmethod
+    def _overlap_levels(candidates: int, index: Dict[str, int], values: Optional[frozenset]) -> List[int]:
+        """levels[k] is the bitmap of candidates found in at least k of the values' postings"""
+        if not values:
+            return [candidates]
+
+        levels = [candidates] + [0] * len(values)
+        for value in values:
+            posting = index.get(value, 0)
+            if posting:
+                for k in range(len(values), 0, -1):
+                    levels[k] |= levels[k - 1] & posting
+        return levels
+
+    def _score_rows(self, rows: List[int], q_cat: Optional[str], q_sym: Optional[frozenset],
+                    q_comp: Optional[frozenset], q_text: Optional[Tuple[int, int]]) -> List[SearchResult]:
+        """Score candidate rows with the compiled kernel; same scores as _calculate_similarity"""
+        n = len(rows)
+        q_cat_id = self._cat2id.get(q_cat, -1) if q_cat is not None else -1
+
+        if q_sym is not None:
+            q_sym_ids = np.array([self._sym2id[s] for s in q_sym if s in self._sym2id], dtype=np.int32)
+            q_sym_len = len(q_sym)
+        else:
+            q_sym_ids, q_sym_len = np.empty(0, dtype=np.int32), -1
+
+        if q_comp is not None:
+            q_comp_ids = np.array([self._comp2id[c] for c in q_comp if c in self._comp2id], dtype=np.int32)
+            q_comp_len = len(q_comp)
+        else:
+            q_comp_ids, q_comp_len = np.empty(0, dtype=np.int32), -1
+
+        scores = np.empty(n, dtype=np.float64)
+        cat_match = np.zeros(n, dtype=np.int8)
+        sym_overlap = np.zeros(n, dtype=np.int32)
+        comp_overlap = np.zeros(n, dtype=np.int32)
+        _score_candidates(np.array(rows, dtype=np.int64), self._cat_ids, q_cat_id,
+                          self._sym_ids, self._sym_len, q_sym_ids, q_sym_len,
+                          self._comp_ids, self._comp_len, q_comp_ids, q_comp_len,
+                          scores, cat_match, sym_overlap, comp_overlap)
+
+        # Kernel outputs as Python lists, so the loop below indexes plain ints and floats
         results = []
-        for error_id in candidates:
-            error = self.known_errors[error_id]
-            similarity, factors = self._calculate_similarity(error, query)
+        known_errors, row_ids = self.known_errors, self._row_ids
+        text_similarity = self._text_similarity
+        threshold = self.min_similarity_threshold
+        for row, score, category, symptoms, components in zip(rows, scores.tolist(), cat_match.tolist(),
+                                                              sym_overlap.tolist(), comp_overlap.tolist()):
+            error = known_errors[row_ids[row]]
+            factors = []
+            if category:
+                factors.append('category')
+            if symptoms:
+                factors.append(f'symptoms ({symptoms} matched)')
+            if components:
+                factors.append(f'components ({components} matched)')
+
+            text_score = text_similarity(row, q_text)
+            if text_score is not None:
+                score += text_score * 0.1
+                factors.append('description')
 
-            if similarity >= self.min_similarity_threshold:
+            similarity = min(score, 1.0)
+            if similarity >= threshold:
                 results.append(SearchResult(
                     known_error=error,
                     similarity_score=similarity,
                     matching_factors=factors
                 ))
 
-        # Sort by similarity
-        results.sort(key=lambda r: r.similarity_score, reverse=True)
-
-        logger.info(f"Search returned {len(results)} results")
         return results
 
-    def _calculate_similarity(self, error: KnownError, query: Dict) -> Tuple[float, List[str]]:
-        """Calculate similarity between known error and query"""
+    def _calculate_similarity(self, error: KnownError, q_cat: Optional[str], q_sym: Optional[frozenset],
+                              q_comp: Optional[frozenset],
+                              q_text: Optional[Tuple[int, int]]) -> Tuple[float, List[str]]:
+        """Calculate similarity between known error and query terms (None for fields the query lacks)"""
         score = 0.0
         factors = []
 
         # Category match
-        if 'category' in query and query['category'] == error.category:
+        if q_cat is not None and q_cat == error.category:
             score += 0.3
             factors.append('category')
 
         # Symptom overlap
-        if 'symptoms' in query:
-            query_symptoms = set(query['symptoms'])
+        if q_sym is not None:
             error_symptoms = set(error.symptoms)
-            overlap = query_symptoms & error_symptoms
+            overlap = q_sym & error_symptoms
 
             if overlap:
-                symptom_score = len(overlap) / max(len(query_symptoms), len(error_symptoms))
+                symptom_score = len(overlap) / max(len(q_sym), len(error_symptoms))
                 score += symptom_score * 0.4
                 factors.append(f'symptoms ({len(overlap)} matched)')
 
         # Component overlap
-        if 'components' in query:
-            query_components = set(query['components'])
+        if q_comp is not None:
             error_components = set(error.affected_components)
-            overlap = query_components & error_components
+            overlap = q_comp & error_components
 
             if overlap:
-                component_score = len(overlap) / max(len(query_components), len(error_components))
+                component_score = len(overlap) / max(len(q_comp), len(error_components))
                 score += component_score * 0.2
                 factors.append(f'components ({len(overlap)} matched)')
 
         # Text similarity (simple keyword matching)
-        if 'description' in query:
-            query_words = set(query['description'].lower().split())
-            error_words = set(error.description.lower().split())
-            overlap = query_words & error_words
-
-            if overlap and query_words:
-                text_score = len(overlap) / len(query_words)
-                score += text_score * 0.1
-                factors.append('description')
+        text_score = self._text_similarity(self._id_to_row[error.id], q_text)
+        if text_score is not None:
+            score += text_score * 0.1
+            factors.append('description')
 
         return min(score, 1.0), factors
 
+    def _query_text(self, query: Dict) -> Optional[Tuple[int, int]]:
+        """Query description as (word bitset over the known vocabulary, distinct word count)"""
+        if 'description' not in query:
+            return None
+
+        query_words = set(query['description'].lower().split())
+        word_bits = self._word_bits
+        mask = 0
+        for word in query_words:
+            bit = word_bits.get(word)
+            if bit is not None:
+                mask |= 1 << bit
+        return mask, len(query_words)
+
+    def _text_similarity(self, row: int, query_text: Optional[Tuple[int, int]]) -> Optional[float]:
+        """Share of query description words found in a row's description, None if no overlap"""
+        if query_text is None:
+            return None
+
+        query_mask, query_word_count = query_text
+        overlap = (query_mask & self._desc_masks[row]).bit_count()
+
+        if overlap and query_word_count:
+            return overlap / query_word_count
+        return None
+
     def get_solution(self, known_error_id: str) -> Optional[Solution]:
         """Get solution for a known error"""
         # In this implementation, we generate solution from known error
@@ -347,14 +772,15 @@ class KEDBService:
             return None
 
         error = self.known_errors[known_error_id]
+        row = self._id_to_row[known_error_id]
 
-        # Generate solution from workaround/fix
+        # Generate solution from workaround/fix, parsed when the error was indexed
         solution = Solution(
             id=f"sol-{known_error_id}",
             known_error_id=known_error_id,
             solution_type="fix" if error.permanent_fix else "workaround",
-            steps=self._parse_solution_steps(error.permanent_fix or error.workaround),
-            estimated_time=self._estimate_resolution_time(error),
+            steps=list(self._solution_steps[row]),
+            estimated_time=self._solution_eta[row],
             success_rate=error.success_rate,
             prerequisites=[],
             created_at=error.created_at,
@@ -383,15 +809,7 @@ class KEDBService:
     def _estimate_resolution_time(self, error: KnownError) -> int:
         """Estimate resolution time in minutes"""
         # Simple heuristic based on category and solution type
-        base_time = {
-            'kubernetes': 15,
-            'database': 30,
-            'performance': 45,
-            'security': 20,
-            'networking': 25
-        }
-
-        time_estimate = base_time.get(error.category, 30)
+        time_estimate = _BASE_RESOLUTION_TIME.get(error.category, 30)
 
         # Permanent fix takes longer
         if error.permanent_fix:
@@ -414,7 +832,10 @@ class KEDBService:
             error.success_rate = (error.success_rate * (error.usage_count - 1)) / error.usage_count
 
         error.updated_at = datetime.now()
-        self._save_known_error(error)
+        self._store_stats(error)
+
+        # Written by _flush_usage, coalesced with any further usage of this error
+        self._dirty.add(error.id)
 
         logger.info(f"Recorded usage for {known_error_id}: success={successful}, "
                    f"new_rate={error.success_rate:.2f}")
@@ -432,8 +853,73 @@ class KEDBService:
 
     def _save_known_error(self, error: KnownError):
         """Persist known error"""
-        error_file = f"{self.data_dir}/known_errors/{error.id}.json"
-        error_data = {
+        self._append_wal({'op': 'put', **self._error_data(error)})
+
+    def _append_wal(self, record: Dict):
+        """Append one change record to the log"""
+        self._wal.write(json_dumps(record) + b'\n')
+
+    def _flush_usage(self) -> bool:
+        """Log the current usage figures of every error used since the last flush
+
+        Records go to the log's buffer; returns whether any were written, so the
+        caller can flush the log off the event loop.
+        """
+        dirty, self._dirty = self._dirty, set()
+        known_errors, append_wal = self.known_errors, self._append_wal
+        for error_id in dirty:
+            error = known_errors[error_id]
+            append_wal({
+                'op': 'usage',
+                'id': error_id,
+                'usage_count': error.usage_count,
+                'success_rate': error.success_rate,
+                'updated_at': error.updated_at.isoformat()
+            })
+        return bool(dirty)
+
+    async def _flush_loop(self):
+        """Flush coalesced usage updates every usage_flush_interval seconds"""
+        while True:
+            await asyncio.sleep(self.usage_flush_interval)
+            try:
+                if self._flush_usage():
+                    await asyncio.to_thread(self._wal.flush)
+            except Exception as e:
+                logger.error(f"Error flushing usage updates: {e}", exc_info=True)
+
+    def _start_snapshot(self) -> Tuple[Dict, object]:
+        """Capture the full state and start a new log for changes made after it
+
+        Returns the snapshot and the superseded log, which _write_snapshot
+        closes and removes once the snapshot is on disk.
+        """
+        # The snapshot carries current usage figures, so pending usage records are moot
+        self._dirty.clear()
+        snapshot = {
+            'timestamp': datetime.now().isoformat(),
+            'known_errors': [self._error_data(error) for error in self.known_errors.values()]
+        }
+
+        old_wal = self._wal
+        os.replace(self._wal_file, f"{self._wal_file}.old")
+        self._wal = open(self._wal_file, 'ab', buffering=1 << 16)
+        return snapshot, old_wal
+
+    def _write_snapshot(self, snapshot: Dict, old_wal):
+        """Write a snapshot from _start_snapshot, then drop the log it supersedes"""
+        old_wal.close()
+
+        tmp_file = f"{self._snapshot_file}.tmp"
+        with open(tmp_file, 'wb') as f:
+            f.write(json_dumps(snapshot))
+        os.replace(tmp_file, self._snapshot_file)
+
+        os.remove(f"{self._wal_file}.old")
+
+    def _error_data(self, error: KnownError) -> Dict:
+        """Serializable form of a known error"""
+        return {
             'id': error.id,
             'title': error.title,
             'description': error.description,
@@ -452,23 +938,58 @@ class KEDBService:
             'tags': error.tags
         }
 
-        with open(error_file, 'w') as f:
-            json.dump(error_data, f, indent=2)
+    def _write_metrics(self, metrics: Dict):
+        """Append one metrics snapshot to the NDJSON metrics file"""
+        if date.today() != self._metrics_day:
+            self._rotate_metrics()
+        self._metrics_fp.write(json_dumps(metrics) + b'\n')
+        self._metrics_fp.flush()
+
+    def _rotate_metrics(self):
+        """Move the metrics file aside under its date and start a new one"""
+        self._metrics_fp.close()
+        os.replace(self._metrics_file, f"{self._metrics_file}.{self._metrics_day.isoformat()}")
+
+        expired = (date.today() - timedelta(days=self.metrics_backup_days)).isoformat()
+        prefix = os.path.basename(self._metrics_file) + '.'
+        metrics_dir = os.path.dirname(self._metrics_file)
+        for name in os.listdir(metrics_dir):
+            if name.startswith(prefix) and name[len(prefix):] < expired:
+                os.remove(os.path.join(metrics_dir, name))
+
+        self._metrics_fp = open(self._metrics_file, 'ab')
+        self._metrics_day = date.today()
 
     def get_metrics(self) -> Dict:
         """Get KEDB metrics"""
-        verified_errors = [e for e in self.known_errors.values() if e.verified]
-        high_usage = [e for e in self.known_errors.values() if e.usage_count > 5]
-        high_success = [e for e in self.known_errors.values() if e.success_rate > 0.9]
+        if np is not None:
+            n = len(self._row_ids)
+            usage_count = self._usage_count[:n]
+            success_rate = self._success_rate[:n]
+
+            verified = int(np.count_nonzero(self._verified[:n]))
+            total_usage = int(usage_count.sum())
+            success_sum = float(success_rate.sum())
+            high_usage = int(np.count_nonzero(usage_count > 5))
+            high_success = int(np.count_nonzero(success_rate > 0.9))
+        else:
+            verified = total_usage = high_usage = high_success = 0
+            success_sum = 0.0
+            for e in self.known_errors.values():
+                verified += e.verified
+                total_usage += e.usage_count
+                success_sum += e.success_rate
+                high_usage += e.usage_count > 5
+                high_success += e.success_rate > 0.9
 
         metrics = {
             'timestamp': datetime.now().isoformat(),
             'total_known_errors': len(self.known_errors),
-            'verified_errors': len(verified_errors),
-            'total_usage': sum(e.usage_count for e in self.known_errors.values()),
-            'avg_success_rate': sum(e.success_rate for e in self.known_errors.values()) / max(len(self.known_errors), 1),
-            'high_usage_errors': len(high_usage),
-            'high_success_errors': len(high_success),
+            'verified_errors': verified,
+            'total_usage': total_usage,
+            'avg_success_rate': success_sum / max(len(self.known_errors), 1),
+            'high_usage_errors': high_usage,
+            'high_success_errors': high_success,
             'categories': len(self.error_index['category']),
             'indexed_symptoms': len(self.error_index['symptoms'])
         }
@@ -479,13 +1000,23 @@ class KEDBService:
         """Main KEDB service loop"""
         logger.info("Starting KEDB Service")
 
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+        last_snapshot = None
         while True:
             try:
                 # Get and save metrics
                 metrics = self.get_metrics()
-                metrics_file = f"{self.data_dir}/metrics/kedb-metrics-{int(time.time())}.json"
-                with open(metrics_file, 'w') as f:
-                    json.dump(metrics, f, indent=2)
+                await asyncio.to_thread(self._write_metrics, metrics)
+
+                # Compact the change log into a snapshot periodically, otherwise just flush it.
+                # State is captured on the loop; file IO runs in a worker thread
+                if last_snapshot is None or time.monotonic() - last_snapshot >= self.snapshot_interval:
+                    await asyncio.to_thread(self._write_snapshot, *self._start_snapshot())
+                    last_snapshot = time.monotonic()
+                else:
+                    await asyncio.to_thread(self._wal.flush)
 
                 logger.info(f"KEDB: {metrics['total_known_errors']} errors, "
                           f"Success rate: {metrics['avg_success_rate']:.2%}, "
@@ -1,6 +1,12 @@
 """Formatters for terse SMS output."""
 from typing import Dict, Any
 
+# Menu footers appended to each summary
+_NET_FOOTER = "\nD)etails  A)lerts  C)lients"
+_PROX_FOOTER = "\nD)etails  V)Ms  N)odes"
+_K8S_FOOTER = "\nD)etails  P)ods  S)ervices"
+_SEC_FOOTER = "\nA)lerts  L)ogs  F)irewall"
+
 
 def format_network_summary(data: Dict[str, Any]) -> str:
     """Format network status to ~300 chars."""
@@ -9,9 +15,7 @@ def format_network_summary(data: Dict[str, Any]) -> str:
     aps = data.get("ap_count", 0)
     alerts = data.get("alert_count", 0)
 
-    msg = f"Network {status}. {devices} devices, {aps} APs, {alerts} alerts.\n"
-    msg += "D)etails  A)lerts  C)lients"
-    return msg
+    return f"Network {status}. {devices} devices, {aps} APs, {alerts} alerts.{_NET_FOOTER}"
 
 
 def format_network_details(data: Dict[str, Any]) -> str:
@@ -19,10 +23,9 @@ def format_network_details(data: Dict[str, Any]) -> str:
     uptime = data.get("uptime", "N/A")
     bandwidth = data.get("bandwidth", {})
 
-    msg = f"Uptime: {uptime}\n"
-    msg += f"WAN: {bandwidth.get('wan_rx', 0)}↓ {bandwidth.get('wan_tx', 0)}↑\n"
-    msg += f"LAN: {bandwidth.get('lan_rx', 0)}↓ {bandwidth.get('lan_tx', 0)}↑"
-    return msg
+    return (f"Uptime: {uptime}\n"
+            f"WAN: {bandwidth.get('wan_rx', 0)}↓ {bandwidth.get('wan_tx', 0)}↑\n"
+            f"LAN: {bandwidth.get('lan_rx', 0)}↓ {bandwidth.get('lan_tx', 0)}↑")
 
 
 def format_network_alerts(alerts: list) -> str:
@@ -30,10 +33,9 @@ def format_network_alerts(alerts: list) -> str:
     if not alerts:
         return "No alerts."
 
-    msg = f"{len(alerts)} alert(s):\n"
-    for alert in alerts[:3]:  # Show max 3
-        msg += f"• {alert.get('message', 'Unknown')}\n"
-    return msg.rstrip()
+    lines = [f"{len(alerts)} alert(s):"]
+    lines.extend(f"• {alert.get('message', 'Unknown')}" for alert in alerts[:3])  # Show max 3
+    return "\n".join(lines)
 
 
 def format_network_clients(clients: list) -> str:
@@ -41,11 +43,11 @@ def format_network_clients(clients: list) -> str:
     if not clients:
         return "No clients."
 
-    msg = f"{len(clients)} client(s):\n"
+    lines = [f"{len(clients)} client(s):"]
     for client in clients[:5]:  # Show max 5
         name = client.get('hostname', client.get('mac', 'Unknown'))
-        msg += f"• {name}\n"
-    return msg.rstrip()
+        lines.append(f"• {name}")
+    return "\n".join(lines)
 
 
 def format_proxmox_summary(data: Dict[str, Any]) -> str:
@@ -58,24 +60,22 @@ def format_proxmox_summary(data: Dict[str, Any]) -> str:
     ram = data.get("ram_usage", 0)
     storage = data.get("storage_usage", 0)
 
-    msg = f"Proxmox {status}. {nodes} nodes, {vms} VMs, {lxc} LXC.\n"
-    msg += f"CPU: {cpu}%  RAM: {ram}%  Storage: {storage}%\n"
-    msg += "D)etails  V)Ms  N)odes"
-    return msg
+    return (f"Proxmox {status}. {nodes} nodes, {vms} VMs, {lxc} LXC.\n"
+            f"CPU: {cpu}%  RAM: {ram}%  Storage: {storage}%{_PROX_FOOTER}")
 
 
 def format_proxmox_details(data: Dict[str, Any]) -> str:
     """Format detailed Proxmox info."""
     nodes = data.get("nodes", [])
 
-    msg = ""
+    lines = []
     for node in nodes[:3]:  # Max 3 nodes
         name = node.get("name", "Unknown")
         status = node.get("status", "unknown")
         cpu = node.get("cpu", 0)
         ram = node.get("ram", 0)
-        msg += f"{name}: {status} CPU:{cpu}% RAM:{ram}%\n"
-    return msg.rstrip()
+        lines.append(f"{name}: {status} CPU:{cpu}% RAM:{ram}%")
+    return "\n".join(lines)
 
 
 def format_proxmox_vms(vms: list) -> str:
@@ -86,10 +86,9 @@ def format_proxmox_vms(vms: list) -> str:
     running = [vm for vm in vms if vm.get("status") == "running"]
     stopped = [vm for vm in vms if vm.get("status") == "stopped"]
 
-    msg = f"{len(running)} running, {len(stopped)} stopped\n"
-    for vm in running[:5]:  # Show max 5 running
-        msg += f"• {vm.get('name', 'Unknown')}\n"
-    return msg.rstrip()
+    lines = [f"{len(running)} running, {len(stopped)} stopped"]
+    lines.extend(f"• {vm.get('name', 'Unknown')}" for vm in running[:5])  # Show max 5 running
+    return "\n".join(lines)
 
 
 def format_k8s_summary(data: Dict[str, Any]) -> str:
@@ -99,21 +98,19 @@ def format_k8s_summary(data: Dict[str, Any]) -> str:
     pending = data.get("pending_count", 0)
     failed = data.get("failed_count", 0)
 
-    msg = f"K8s {status}. {pods} pods, {pending} pending, {failed} failed.\n"
-    msg += "D)etails  P)ods  S)ervices"
-    return msg
+    return f"K8s {status}. {pods} pods, {pending} pending, {failed} failed.{_K8S_FOOTER}"
 
 
 def format_k8s_details(data: Dict[str, Any]) -> str:
     """Format detailed K8s info."""
     namespaces = data.get("namespaces", [])
 
-    msg = f"{len(namespaces)} namespace(s):\n"
+    lines = [f"{len(namespaces)} namespace(s):"]
     for ns in namespaces[:5]:  # Max 5
         name = ns.get("name", "Unknown")
         pod_count = ns.get("pod_count", 0)
-        msg += f"• {name}: {pod_count} pods\n"
-    return msg.rstrip()
+        lines.append(f"• {name}: {pod_count} pods")
+    return "\n".join(lines)
 
 
 def format_k8s_pods(pods: list) -> str:
@@ -121,12 +118,12 @@ def format_k8s_pods(pods: list) -> str:
     if not pods:
         return "No pods."
 
-    msg = ""
+    lines = []
     for pod in pods[:8]:  # Show max 8
         name = pod.get("name", "Unknown")
         status = pod.get("status", "unknown")
-        msg += f"• {name}: {status}\n"
-    return msg.rstrip()
+        lines.append(f"• {name}: {status}")
+    return "\n".join(lines)
 
 
 def format_security_summary(data: Dict[str, Any]) -> str:
@@ -135,9 +132,7 @@ def format_security_summary(data: Dict[str, Any]) -> str:
     critical = data.get("critical_count", 0)
     warnings = data.get("warning_count", 0)
 
-    msg = f"Security {status}. {critical} critical, {warnings} warnings.\n"
-    msg += "A)lerts  L)ogs  F)irewall"
-    return msg
+    return f"Security {status}. {critical} critical, {warnings} warnings.{_SEC_FOOTER}"
 
 
 def format_security_alerts(alerts: list) -> str:
@@ -145,12 +140,12 @@ def format_security_alerts(alerts: list) -> str:
     if not alerts:
         return "No alerts."
 
-    msg = f"{len(alerts)} alert(s):\n"
+    lines = [f"{len(alerts)} alert(s):"]
     for alert in alerts[:3]:  # Show max 3
         severity = alert.get("severity", "info")
         message = alert.get("message", "Unknown")
-        msg += f"• [{severity}] {message}\n"
-    return msg.rstrip()
+        lines.append(f"• [{severity}] {message}")
+    return "\n".join(lines)
 
 
 def format_security_logs(logs: list) -> str:
@@ -158,14 +153,27 @@ def format_security_logs(logs: list) -> str:
     if not logs:
         return "No recent logs."
 
-    msg = f"{len(logs)} log(s):\n"
-    for log in logs[:5]:  # Show max 5
-        msg += f"• {log.get('message', 'Unknown')}\n"
-    return msg.rstrip()
+    lines = [f"{len(logs)} log(s):"]
+    lines.extend(f"• {log.get('message', 'Unknown')}" for log in logs[:5])  # Show max 5
+    return "\n".join(lines)
+
+
+def format_status(network: Dict[str, Any], proxmox: Dict[str, Any],
+                  k8s: Dict[str, Any], security: Dict[str, Any]) -> str:
+    """Format one status line per system, from their summaries."""
+    summaries = (
+        format_network_summary(network),
+        format_proxmox_summary(proxmox),
+        format_k8s_summary(k8s),
+        format_security_summary(security)
+    )
+    return "\n".join(summary.split("\n", 1)[0] for summary in summaries)
 
 
 def truncate_message(msg: str, max_length: int = 320) -> str:
-    """Truncate message to max SMS length."""
-    if len(msg) <= max_length:
+    """Truncate message to max SMS length, counted in UTF-8 bytes."""
+    encoded = msg.encode("utf-8")
+    if len(encoded) <= max_length:
         return msg
-    return msg[:max_length - 3] + "..."
+    # Cut on a byte boundary and drop any code point split by the cut
+    return encoded[:max_length - 3].decode("utf-8", "ignore") + "..."
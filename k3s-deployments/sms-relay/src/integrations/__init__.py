@@ -1 +1,175 @@
 """MCP server integrations."""
+import asyncio
+import functools
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import httpx
+import orjson
+from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_random_exponential
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Create the HTTP client shared by every integration, so requests reuse pooled connections.
+
+    The app lifespan owns it: it binds the client to each integration and closes it on shutdown.
+    """
+    # HTTP/2 is negotiated over TLS; plain http:// endpoints keep using HTTP/1.1
+    return httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+    )
+
+
+# How long a cached result may still be served once expired, while its upstream is failing
+STALE_TTL = 3600.0
+# Results kept per cached method; arguments such as namespaces come from SMS input
+CACHE_MAX_ENTRIES = 128
+
+
+def cached(ttl: float, fallback: Callable[[Any], Any]):
+    """Cache an integration method's result per client and arguments for ttl seconds.
+
+    If the upstream call raises, the last result younger than STALE_TTL is served
+    instead; fallback(self) is returned only when there is none. At most
+    CACHE_MAX_ENTRIES results are kept, evicting the least recently used.
+    """
+    def decorator(func):
+        entries: OrderedDict[tuple, Tuple[float, Any]] = OrderedDict()
+
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            key = (self, args, tuple(sorted(kwargs.items())))
+            now = time.monotonic()
+            entry = entries.get(key)
+            if entry is not None and now - entry[0] < ttl:
+                entries.move_to_end(key)
+                return entry[1]
+
+            try:
+                result = await func(self, *args, **kwargs)
+            except Exception as e:
+                if entry is not None and now - entry[0] < STALE_TTL:
+                    print(f"{func.__qualname__} error: {e}; serving result from {now - entry[0]:.0f}s ago")
+                    return entry[1]
+                print(f"{func.__qualname__} error: {e}")
+                return fallback(self)
+
+            entries[key] = (now, result)
+            entries.move_to_end(key)
+            if len(entries) > CACHE_MAX_ENTRIES:
+                entries.popitem(last=False)
+            return result
+
+        return wrapper
+    return decorator
+
+
+# Consecutive failures that open an MCP server's circuit, and how long it then stays open
+CIRCUIT_THRESHOLD = 5
+CIRCUIT_OPEN_SECONDS = 10.0
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an MCP server whose circuit is open."""
+
+
+@dataclass
+class CircuitState:
+    """Failure tracking for one MCP server."""
+
+    failures: int = 0
+    open_until: float = 0.0
+
+
+# Keyed by base_url, so every client of the same server shares one breaker
+_circuits: Dict[str, CircuitState] = {}
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def _encode_tool_call(tool: str, arguments: Dict[str, Any]) -> bytes:
+    """Encode a JSON-RPC tools/call request body."""
+    return orjson.dumps({"method": "tools/call", "params": {"name": tool, "arguments": arguments}})
+
+
+@functools.lru_cache(maxsize=None)
+def _static_tool_call(tool: str) -> bytes:
+    """Encoded body for a call without arguments; the same bytes are sent every time."""
+    return _encode_tool_call(tool, {})
+
+
+class MCPClient:
+    """Base client for an MCP server: integrations map their methods onto call()."""
+
+    def __init__(self, base_url: str, http: Optional[httpx.AsyncClient] = None):
+        self.base_url = base_url
+        self.timeout = 10.0
+        self.http = http  # Shared client, bound by the app lifespan
+
+    async def call(
+        self,
+        tool: str,
+        arguments: Optional[Dict[str, Any]] = None,
+        default: Callable[[], Any] = dict
+    ) -> Any:
+        """Call an MCP tool and decode its first text content; default() if it returns none.
+
+        Transport errors are retried once after a short jittered backoff. After
+        CIRCUIT_THRESHOLD consecutive failures the server's circuit opens, and calls
+        raise CircuitOpenError without touching it for CIRCUIT_OPEN_SECONDS.
+        """
+        circuit = _circuits.setdefault(self.base_url, CircuitState())
+        if time.monotonic() < circuit.open_until:
+            raise CircuitOpenError(f"{self.base_url} circuit open")
+
+        body = _encode_tool_call(tool, arguments) if arguments else _static_tool_call(tool)
+        try:
+            async for attempt in AsyncRetrying(
+                stop=stop_after_attempt(2),
+                wait=wait_random_exponential(multiplier=0.05, max=0.5),
+                retry=retry_if_exception_type(httpx.TransportError),
+                reraise=True
+            ):
+                with attempt:
+                    response = await self.http.post(
+                        f"{self.base_url}/mcp",
+                        content=body,
+                        headers=_JSON_HEADERS,
+                        timeout=self.timeout
+                    )
+                    response.raise_for_status()
+        except Exception:
+            circuit.failures += 1
+            if circuit.failures >= CIRCUIT_THRESHOLD:
+                # Stays at the threshold, so a failed probe after the window reopens it
+                circuit.open_until = time.monotonic() + CIRCUIT_OPEN_SECONDS
+            raise
+        circuit.failures = 0
+
+        data = orjson.loads(response.content)
+
+        try:
+            text = data["result"]["content"][0]["text"]
+        except (KeyError, IndexError, TypeError):
+            return default()
+        return orjson.loads(text)
+
+
+# Imported last: the integration modules use the helpers above
+from src.integrations.k8s import k8s_client  # noqa: E402
+from src.integrations.proxmox import proxmox_client  # noqa: E402
+from src.integrations.security import security_client  # noqa: E402
+from src.integrations.unifi import unifi_client  # noqa: E402
+
+
+async def gather_status() -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+    """Fetch the network, Proxmox, K8s and security summaries concurrently."""
+    async with asyncio.TaskGroup() as tg:
+        network = tg.create_task(unifi_client.get_summary())
+        proxmox = tg.create_task(proxmox_client.get_summary())
+        k8s = tg.create_task(k8s_client.get_summary())
+        security = tg.create_task(security_client.get_summary())
+    return network.result(), proxmox.result(), k8s.result(), security.result()
@@ -7,30 +7,36 @@ class ClaudeClient:
     """Client for Claude AI queries."""
 
     def __init__(self):
-        self.client = anthropic.Anthropic(api_key=settings.anthropic_api_key)
+        self.client = anthropic.AsyncAnthropic(api_key=settings.anthropic_api_key)
         self.model = "claude-sonnet-4-5-20250929"
         self.max_tokens = 300  # Keep responses short for SMS
 
+        # Fixed instructions, built once; per-call context is appended after them
+        self._system_prompt = """You are an infrastructure assistant. Provide concise answers (max 2-3 sentences) suitable for SMS.
+Focus on actionable information. Be direct and technical."""
+
     async def query(self, message: str, context: str = "") -> str:
         """Query Claude with infrastructure context."""
         try:
-            system_prompt = """You are an infrastructure assistant. Provide concise answers (max 2-3 sentences) suitable for SMS.
-Focus on actionable information. Be direct and technical."""
-
+            system_prompt = self._system_prompt
             if context:
-                system_prompt += f"\n\nContext: {context}"
+                system_prompt = f"{system_prompt}\n\nContext: {context}"
 
-            response = self.client.messages.create(
+            # Stream the reply so the event loop stays free while the model responds
+            chunks = []
+            async with self.client.messages.stream(
                 model=self.model,
                 max_tokens=self.max_tokens,
                 system=system_prompt,
                 messages=[
                     {"role": "user", "content": message}
                 ]
-            )
+            ) as stream:
+                async for text in stream.text_stream:
+                    chunks.append(text)
 
-            if response.content and len(response.content) > 0:
-                return response.content[0].text
+            if chunks:
+                return "".join(chunks)
 
             return "Unable to process query."
 
@@ -1,18 +1,20 @@
 """Cortex orchestrator integration for complex queries."""
 import httpx
-import json
+import orjson
 from datetime import datetime
+from typing import Optional
 from src.config import settings
 
 
 class CortexClient:
     """Client for Cortex orchestrator queries."""
 
-    def __init__(self):
+    def __init__(self, http: Optional[httpx.AsyncClient] = None):
         # Cortex orchestrator URL (same as chat backend uses)
         self.base_url = "http://cortex-orchestrator.cortex.svc.cluster.local:8000"
         self.timeout = 120.0  # 2 minute timeout for SMS queries
         self.max_response_length = 600  # Keep responses short for SMS (2 messages worth)
+        self.http = http  # Shared client, bound by the app lifespan
 
     async def query(self, message: str) -> str:
         """
@@ -36,49 +38,46 @@ class CortexClient:
 
             print(f"[CortexClient] Sending query to Cortex: {message}")
 
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/api/tasks",
-                    json=task_payload,
-                    headers={"Content-Type": "application/json"}
-                )
-
+            # Read the SSE stream ("data: {json}" lines) as it arrives and stop at the
+            # first terminal frame, rather than waiting for the stream to close
+            cortex_result = None
+            async with self.http.stream(
+                "POST",
+                f"{self.base_url}/api/tasks",
+                content=orjson.dumps(task_payload),
+                headers={"Content-Type": "application/json"},
+                timeout=self.timeout
+            ) as response:
                 if response.status_code != 200:
                     print(f"[CortexClient] Error: HTTP {response.status_code}")
                     return f"Cortex error: HTTP {response.status_code}"
 
-                # Parse SSE stream response
-                response_text = response.text
-
-                # Extract the final result from SSE stream
-                # SSE format: "data: {json}\n\n"
-                lines = response_text.strip().split('\n')
-                cortex_result = None
-
-                for line in lines:
-                    if line.startswith('data: '):
-                        try:
-                            data = json.loads(line[6:])  # Skip "data: " prefix
-                            if data.get('status') in ['completed', 'success']:
-                                cortex_result = data
-                        except json.JSONDecodeError:
-                            continue
+                async for line in response.aiter_lines():
+                    if not line.startswith('data: '):
+                        continue
+                    try:
+                        data = orjson.loads(line[6:])  # Skip "data: " prefix
+                    except orjson.JSONDecodeError:
+                        continue
+                    if data.get('status') in ('completed', 'success'):
+                        cortex_result = data
+                        break
 
-                if not cortex_result:
-                    print(f"[CortexClient] No valid result in SSE stream")
-                    return "No response from Cortex"
+            if not cortex_result:
+                print(f"[CortexClient] No valid result in SSE stream")
+                return "No response from Cortex"
 
-                # Extract answer from result
-                result_data = cortex_result.get('result', {})
-                answer = result_data.get('answer') or result_data.get('output') or str(result_data)
+            # Extract answer from result
+            result_data = cortex_result.get('result', {})
+            answer = result_data.get('answer') or result_data.get('output') or str(result_data)
 
-                print(f"[CortexClient] Got response ({len(answer)} chars)")
+            print(f"[CortexClient] Got response ({len(answer)} chars)")
 
-                # Truncate if too long for SMS
-                if len(answer) > self.max_response_length:
-                    answer = answer[:self.max_response_length - 20] + "\n\n[Truncated]"
+            # Truncate if too long for SMS
+            if len(answer) > self.max_response_length:
+                answer = answer[:self.max_response_length - 20] + "\n\n[Truncated]"
 
-                return answer
+            return answer
 
         except httpx.TimeoutException:
             print(f"[CortexClient] Timeout after {self.timeout}s")
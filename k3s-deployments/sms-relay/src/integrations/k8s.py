@@ -1,139 +1,35 @@
 """Kubernetes MCP integration."""
 import httpx
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from src.config import settings
+from src.integrations import MCPClient, cached
 
 
-class K8sClient:
+class K8sClient(MCPClient):
     """Client for Kubernetes MCP server."""
 
-    def __init__(self):
-        self.base_url = settings.k8s_mcp_url
-        self.timeout = 10.0
+    def __init__(self, http: Optional[httpx.AsyncClient] = None):
+        super().__init__(settings.k8s_mcp_url, http)
 
+    @cached(ttl=30, fallback=lambda self: self._mock_summary())
     async def get_summary(self) -> Dict[str, Any]:
         """Get K8s summary."""
-        try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/mcp",
-                    json={
-                        "method": "tools/call",
-                        "params": {
-                            "name": "get_cluster_status",
-                            "arguments": {}
-                        }
-                    }
-                )
-                response.raise_for_status()
-                data = response.json()
-
-                result = data.get("result", {})
-                content = result.get("content", [])
-
-                if content and len(content) > 0:
-                    text = content[0].get("text", "{}")
-                    import json
-                    return json.loads(text)
-
-                return self._mock_summary()
-
-        except Exception as e:
-            print(f"K8s error: {e}")
-            return self._mock_summary()
+        return await self.call("get_cluster_status", default=self._mock_summary)
 
+    @cached(ttl=30, fallback=lambda self: self._mock_details())
     async def get_details(self) -> Dict[str, Any]:
         """Get detailed K8s info."""
-        try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/mcp",
-                    json={
-                        "method": "tools/call",
-                        "params": {
-                            "name": "get_namespaces",
-                            "arguments": {}
-                        }
-                    }
-                )
-                response.raise_for_status()
-                data = response.json()
-
-                result = data.get("result", {})
-                content = result.get("content", [])
-
-                if content and len(content) > 0:
-                    text = content[0].get("text", "{}")
-                    import json
-                    return json.loads(text)
-
-                return self._mock_details()
-
-        except Exception as e:
-            print(f"K8s error: {e}")
-            return self._mock_details()
+        return await self.call("get_namespaces", default=self._mock_details)
 
+    @cached(ttl=10, fallback=lambda self: self._mock_pods())
     async def get_pods(self, namespace: str = "all") -> list:
         """Get pod list."""
-        try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/mcp",
-                    json={
-                        "method": "tools/call",
-                        "params": {
-                            "name": "list_pods",
-                            "arguments": {"namespace": namespace}
-                        }
-                    }
-                )
-                response.raise_for_status()
-                data = response.json()
-
-                result = data.get("result", {})
-                content = result.get("content", [])
-
-                if content and len(content) > 0:
-                    text = content[0].get("text", "[]")
-                    import json
-                    return json.loads(text)
-
-                return self._mock_pods()
-
-        except Exception as e:
-            print(f"K8s error: {e}")
-            return self._mock_pods()
+        return await self.call("list_pods", {"namespace": namespace}, default=self._mock_pods)
 
+    @cached(ttl=30, fallback=lambda self: [])
     async def get_services(self, namespace: str = "all") -> list:
         """Get service list."""
-        try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/mcp",
-                    json={
-                        "method": "tools/call",
-                        "params": {
-                            "name": "list_services",
-                            "arguments": {"namespace": namespace}
-                        }
-                    }
-                )
-                response.raise_for_status()
-                data = response.json()
-
-                result = data.get("result", {})
-                content = result.get("content", [])
-
-                if content and len(content) > 0:
-                    text = content[0].get("text", "[]")
-                    import json
-                    return json.loads(text)
-
-                return []
-
-        except Exception as e:
-            print(f"K8s error: {e}")
-            return []
+        return await self.call("list_services", {"namespace": namespace}, default=list)
 
     def _mock_summary(self) -> Dict[str, Any]:
         """Mock summary for testing."""
@@ -1,140 +1,36 @@
 """Proxmox MCP integration."""
 import httpx
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from src.config import settings
+from src.integrations import MCPClient, cached
 
 
-class ProxmoxClient:
+class ProxmoxClient(MCPClient):
     """Client for Proxmox MCP server."""
 
-    def __init__(self):
-        self.base_url = settings.proxmox_mcp_url
-        self.timeout = 10.0
+    def __init__(self, http: Optional[httpx.AsyncClient] = None):
+        super().__init__(settings.proxmox_mcp_url, http)
 
+    @cached(ttl=30, fallback=lambda self: self._mock_summary())
     async def get_summary(self) -> Dict[str, Any]:
         """Get Proxmox summary."""
-        try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/mcp",
-                    json={
-                        "method": "tools/call",
-                        "params": {
-                            "name": "get_cluster_status",
-                            "arguments": {}
-                        }
-                    }
-                )
-                response.raise_for_status()
-                data = response.json()
-
-                result = data.get("result", {})
-                content = result.get("content", [])
-
-                if content and len(content) > 0:
-                    text = content[0].get("text", "{}")
-                    import json
-                    return json.loads(text)
-
-                return self._mock_summary()
-
-        except Exception as e:
-            print(f"Proxmox error: {e}")
-            return self._mock_summary()
+        return await self.call("get_cluster_status", default=self._mock_summary)
 
+    @cached(ttl=30, fallback=lambda self: self._mock_details())
     async def get_details(self) -> Dict[str, Any]:
         """Get detailed Proxmox info."""
-        try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/mcp",
-                    json={
-                        "method": "tools/call",
-                        "params": {
-                            "name": "get_nodes",
-                            "arguments": {}
-                        }
-                    }
-                )
-                response.raise_for_status()
-                data = response.json()
-
-                result = data.get("result", {})
-                content = result.get("content", [])
-
-                if content and len(content) > 0:
-                    text = content[0].get("text", "{}")
-                    import json
-                    return json.loads(text)
-
-                return self._mock_details()
-
-        except Exception as e:
-            print(f"Proxmox error: {e}")
-            return self._mock_details()
+        return await self.call("get_nodes", default=self._mock_details)
 
+    @cached(ttl=10, fallback=lambda self: self._mock_vms())
     async def get_vms(self) -> list:
         """Get VM list."""
-        try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/mcp",
-                    json={
-                        "method": "tools/call",
-                        "params": {
-                            "name": "list_vms",
-                            "arguments": {}
-                        }
-                    }
-                )
-                response.raise_for_status()
-                data = response.json()
-
-                result = data.get("result", {})
-                content = result.get("content", [])
-
-                if content and len(content) > 0:
-                    text = content[0].get("text", "[]")
-                    import json
-                    return json.loads(text)
-
-                return self._mock_vms()
-
-        except Exception as e:
-            print(f"Proxmox error: {e}")
-            return self._mock_vms()
+        return await self.call("list_vms", default=self._mock_vms)
 
+    @cached(ttl=30, fallback=lambda self: [])
     async def get_nodes(self) -> list:
         """Get node list."""
-        try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/mcp",
-                    json={
-                        "method": "tools/call",
-                        "params": {
-                            "name": "get_nodes",
-                            "arguments": {}
-                        }
-                    }
-                )
-                response.raise_for_status()
-                data = response.json()
-
-                result = data.get("result", {})
-                content = result.get("content", [])
-
-                if content and len(content) > 0:
-                    text = content[0].get("text", "[]")
-                    import json
-                    nodes = json.loads(text)
-                    return nodes.get("nodes", [])
-
-                return []
-
-        except Exception as e:
-            print(f"Proxmox error: {e}")
-            return []
+        nodes = await self.call("get_nodes", default=dict)
+        return nodes.get("nodes", [])
 
     def _mock_summary(self) -> Dict[str, Any]:
         """Mock summary for testing."""
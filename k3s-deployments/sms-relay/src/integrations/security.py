@@ -1,139 +1,35 @@
 """Security MCP integration."""
 import httpx
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from src.config import settings
+from src.integrations import MCPClient, cached
 
 
-class SecurityClient:
+class SecurityClient(MCPClient):
     """Client for Security MCP server."""
 
-    def __init__(self):
-        self.base_url = settings.security_mcp_url
-        self.timeout = 10.0
+    def __init__(self, http: Optional[httpx.AsyncClient] = None):
+        super().__init__(settings.security_mcp_url, http)
 
+    @cached(ttl=30, fallback=lambda self: self._mock_summary())
     async def get_summary(self) -> Dict[str, Any]:
         """Get security summary."""
-        try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/mcp",
-                    json={
-                        "method": "tools/call",
-                        "params": {
-                            "name": "get_security_status",
-                            "arguments": {}
-                        }
-                    }
-                )
-                response.raise_for_status()
-                data = response.json()
-
-                result = data.get("result", {})
-                content = result.get("content", [])
-
-                if content and len(content) > 0:
-                    text = content[0].get("text", "{}")
-                    import json
-                    return json.loads(text)
-
-                return self._mock_summary()
-
-        except Exception as e:
-            print(f"Security error: {e}")
-            return self._mock_summary()
+        return await self.call("get_security_status", default=self._mock_summary)
 
+    @cached(ttl=5, fallback=lambda self: self._mock_alerts())
     async def get_alerts(self) -> list:
         """Get security alerts."""
-        try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/mcp",
-                    json={
-                        "method": "tools/call",
-                        "params": {
-                            "name": "get_alerts",
-                            "arguments": {}
-                        }
-                    }
-                )
-                response.raise_for_status()
-                data = response.json()
-
-                result = data.get("result", {})
-                content = result.get("content", [])
-
-                if content and len(content) > 0:
-                    text = content[0].get("text", "[]")
-                    import json
-                    return json.loads(text)
-
-                return self._mock_alerts()
-
-        except Exception as e:
-            print(f"Security error: {e}")
-            return self._mock_alerts()
+        return await self.call("get_alerts", default=self._mock_alerts)
 
+    @cached(ttl=10, fallback=lambda self: [])
     async def get_logs(self) -> list:
         """Get recent security logs."""
-        try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/mcp",
-                    json={
-                        "method": "tools/call",
-                        "params": {
-                            "name": "get_recent_logs",
-                            "arguments": {"limit": 10}
-                        }
-                    }
-                )
-                response.raise_for_status()
-                data = response.json()
-
-                result = data.get("result", {})
-                content = result.get("content", [])
-
-                if content and len(content) > 0:
-                    text = content[0].get("text", "[]")
-                    import json
-                    return json.loads(text)
-
-                return []
-
-        except Exception as e:
-            print(f"Security error: {e}")
-            return []
+        return await self.call("get_recent_logs", {"limit": 10}, default=list)
 
+    @cached(ttl=30, fallback=lambda self: {"status": "unknown", "rules": 0})
     async def get_firewall_status(self) -> Dict[str, Any]:
         """Get firewall status."""
-        try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/mcp",
-                    json={
-                        "method": "tools/call",
-                        "params": {
-                            "name": "get_firewall_status",
-                            "arguments": {}
-                        }
-                    }
-                )
-                response.raise_for_status()
-                data = response.json()
-
-                result = data.get("result", {})
-                content = result.get("content", [])
-
-                if content and len(content) > 0:
-                    text = content[0].get("text", "{}")
-                    import json
-                    return json.loads(text)
-
-                return {"status": "active", "rules": 42}
-
-        except Exception as e:
-            print(f"Security error: {e}")
-            return {"status": "unknown", "rules": 0}
+        return await self.call("get_firewall_status", default=lambda: {"status": "active", "rules": 42})
 
     def _mock_summary(self) -> Dict[str, Any]:
         """Mock summary for testing."""
@@ -1,140 +1,35 @@
 """UniFi MCP integration."""
 import httpx
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from src.config import settings
+from src.integrations import MCPClient, cached
 
 
-class UniFiClient:
+class UniFiClient(MCPClient):
     """Client for UniFi MCP server."""
 
-    def __init__(self):
-        self.base_url = settings.unifi_mcp_url
-        self.timeout = 10.0
+    def __init__(self, http: Optional[httpx.AsyncClient] = None):
+        super().__init__(settings.unifi_mcp_url, http)
 
+    @cached(ttl=30, fallback=lambda self: self._mock_summary())
     async def get_summary(self) -> Dict[str, Any]:
         """Get network summary."""
-        try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/mcp",
-                    json={
-                        "method": "tools/call",
-                        "params": {
-                            "name": "get_network_status",
-                            "arguments": {}
-                        }
-                    }
-                )
-                response.raise_for_status()
-                data = response.json()
-
-                # Parse MCP response
-                result = data.get("result", {})
-                content = result.get("content", [])
-
-                if content and len(content) > 0:
-                    text = content[0].get("text", "{}")
-                    import json
-                    return json.loads(text)
-
-                return self._mock_summary()
-
-        except Exception as e:
-            print(f"UniFi error: {e}")
-            return self._mock_summary()
+        return await self.call("get_network_status", default=self._mock_summary)
 
+    @cached(ttl=30, fallback=lambda self: self._mock_details())
     async def get_details(self) -> Dict[str, Any]:
         """Get detailed network info."""
-        try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/mcp",
-                    json={
-                        "method": "tools/call",
-                        "params": {
-                            "name": "get_network_details",
-                            "arguments": {}
-                        }
-                    }
-                )
-                response.raise_for_status()
-                data = response.json()
-
-                result = data.get("result", {})
-                content = result.get("content", [])
-
-                if content and len(content) > 0:
-                    text = content[0].get("text", "{}")
-                    import json
-                    return json.loads(text)
-
-                return self._mock_details()
-
-        except Exception as e:
-            print(f"UniFi error: {e}")
-            return self._mock_details()
+        return await self.call("get_network_details", default=self._mock_details)
 
+    @cached(ttl=5, fallback=lambda self: [])
     async def get_alerts(self) -> list:
         """Get network alerts."""
-        try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/mcp",
-                    json={
-                        "method": "tools/call",
-                        "params": {
-                            "name": "get_alerts",
-                            "arguments": {}
-                        }
-                    }
-                )
-                response.raise_for_status()
-                data = response.json()
-
-                result = data.get("result", {})
-                content = result.get("content", [])
-
-                if content and len(content) > 0:
-                    text = content[0].get("text", "[]")
-                    import json
-                    return json.loads(text)
-
-                return []
-
-        except Exception as e:
-            print(f"UniFi error: {e}")
-            return []
+        return await self.call("get_alerts", default=list)
 
+    @cached(ttl=10, fallback=lambda self: [])
     async def get_clients(self) -> list:
         """Get connected clients."""
-        try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/mcp",
-                    json={
-                        "method": "tools/call",
-                        "params": {
-                            "name": "get_clients",
-                            "arguments": {}
-                        }
-                    }
-                )
-                response.raise_for_status()
-                data = response.json()
-
-                result = data.get("result", {})
-                content = result.get("content", [])
-
-                if content and len(content) > 0:
-                    text = content[0].get("text", "[]")
-                    import json
-                    return json.loads(text)
-
-                return []
-
-        except Exception as e:
-            print(f"UniFi error: {e}")
-            return []
+        return await self.call("get_clients", default=list)
 
     def _mock_summary(self) -> Dict[str, Any]:
         """Mock summary for testing."""
@@ -10,15 +10,26 @@ from src.menus.network import handle_network_menu
 from src.menus.proxmox import handle_proxmox_menu
 from src.menus.k8s import handle_k8s_menu
 from src.menus.security import handle_security_menu
+from src.formatters import format_status
+from src.integrations import create_http_client, gather_status
 from src.integrations.cortex import cortex_client
+from src.integrations.k8s import k8s_client
+from src.integrations.proxmox import proxmox_client
+from src.integrations.security import security_client
+from src.integrations.unifi import unifi_client
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan handler."""
     print("SMS Relay service starting...")
-    yield
-    print("SMS Relay service shutting down...")
+    # One connection pool for all integrations, closed when the app shuts down
+    async with create_http_client() as http:
+        app.state.http = http
+        for client in (cortex_client, k8s_client, proxmox_client, security_client, unifi_client):
+            client.http = http
+        yield
+        print("SMS Relay service shutting down...")
 
 
 app = FastAPI(
@@ -42,11 +53,15 @@ async def process_message(from_number: str, body: str) -> str:
     if message.lower() in ["?", "help"]:
         return """Commands:
 home/h/menu: Main menu
+status: All systems at a glance
 ?: Help
 1-5: Menu options
 
 In menus, use letter shortcuts like D for Details."""
 
+    if message.lower() == "status":
+        return format_status(*await gather_status())
+
     # Cortex mode (AI queries)
     if state.claude_mode:
         if message.lower() in ["home", "h", "menu", "exit", "quit"]: